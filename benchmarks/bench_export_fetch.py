@@ -0,0 +1,60 @@
+"""
+Export fetch throughput for different strategies and chunk sizes.
+
+Generated log records are saved in a transaction which is rolled back at the end.
+
+    python -m benchmarks.bench_export_fetch [count]
+"""
+
+import sys
+
+from benchmarks.utils import measure, report, setup_django
+
+
+setup_django()
+
+from django.db import connection, transaction  # noqa: E402
+
+from importer.services import validate_items  # noqa: E402
+from pilotlog.exporter.services import FETCH_STRATEGIES  # noqa: E402
+from pilotlog.importer.entities import TableType  # noqa: E402
+from pilotlog.importer.services import (  # noqa: E402
+    PilotlogCopySaver,
+    PilotlogJsonValidator,
+)
+from pilotlog.models import Flight  # noqa: E402
+from tests.factories import build_log_record_data  # noqa: E402
+
+
+CHUNK_SIZES = [100, 1_000, 2_000, 10_000]
+
+
+class Rollback(Exception):
+    pass
+
+
+def main(count: int = 100_000) -> None:
+    items = (build_log_record_data(TableType.FLIGHT) for _ in range(count))
+    try:
+        with transaction.atomic():
+            PilotlogCopySaver(chunk_size=10_000).save(
+                validate_items(items, PilotlogJsonValidator())
+            )
+            with connection.cursor() as cursor:
+                # planner statistics for the generated rows
+                cursor.execute("ANALYZE")
+            queryset = Flight.objects.data_for_export()
+            for name, iter_rows in FETCH_STRATEGIES.items():
+                for chunk_size in CHUNK_SIZES:
+                    seconds = measure(
+                        lambda: sum(1 for _ in iter_rows(queryset, chunk_size)),
+                        repeat=1,
+                    )
+                    report(f"{name}, chunk size {chunk_size}", count, seconds, "rows")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
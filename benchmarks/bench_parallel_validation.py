@@ -0,0 +1,119 @@
+"""
+Validation throughput of `validate_items_in_parallel` by number of workers,
+compared with sequential validation and with workers sending validated models
+back to the parent (before `dump_model` payloads).
+
+The parent receives and rebuilds all validated items, so its cost per record
+limits the speedup of any number of workers, it's reported first.
+Processes are spawned and set up before timing, as a reused executor is.
+
+    python -m benchmarks.bench_parallel_validation [count]
+"""
+
+import pickle
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from benchmarks.utils import measure, report, setup_django
+
+
+setup_django()
+
+import django  # noqa: E402
+
+from importer.services import (  # noqa: E402
+    chunked,
+    create_validation_executor,
+    dump_model,
+    load_payloads,
+    validate_batch,
+    validate_items,
+    validate_items_in_parallel,
+)
+from pilotlog.importer.generator import LogbookGenerator  # noqa: E402
+from pilotlog.importer.services import PilotlogJsonValidator  # noqa: E402
+
+
+WORKERS = [2, 4, 8]
+BATCH_SIZE = 1_000
+
+
+def main(count: int = 100_000) -> None:
+    # about 7% of records of a logbook are not flights
+    items = list(LogbookGenerator(flights=count * 100 // 107).generate())
+    count = len(items)
+    validator = PilotlogJsonValidator()
+
+    validated_items = validate_batch(items, validator)
+    models_data = pickle.dumps(validated_items)
+    payloads_data = pickle.dumps([dump_model(item) for item in validated_items])
+    report(
+        "parent: unpickle models (before)",
+        count,
+        measure(lambda: pickle.loads(models_data)),
+    )
+    report(
+        "parent: unpickle and load payloads",
+        count,
+        measure(lambda: load_payloads(pickle.loads(payloads_data))),
+    )
+    report(
+        "sequential",
+        count,
+        measure(lambda: list(validate_items(items, validator))),
+    )
+    for workers in WORKERS:
+        with create_validation_executor(workers, django.setup) as executor:
+            # spawn and set up all processes before timing
+            list(
+                executor.map(
+                    validate_batch, [items[:1]] * workers, [validator] * workers
+                )
+            )
+
+            report(
+                f"{workers} workers, models (before)",
+                count,
+                measure(
+                    lambda: list(
+                        validate_with_models(items, validator, workers, executor)
+                    )
+                ),
+            )
+            report(
+                f"{workers} workers, payloads",
+                count,
+                measure(
+                    lambda: list(
+                        validate_items_in_parallel(
+                            items,
+                            validator,
+                            workers,
+                            batch_size=BATCH_SIZE,
+                            executor=executor,
+                        )
+                    )
+                ),
+            )
+
+
+def validate_with_models(
+    items: list[dict[str, Any]],
+    validator: PilotlogJsonValidator,
+    workers: int,
+    executor: ProcessPoolExecutor,
+) -> Any:
+    """`validate_items_in_parallel` before workers returned payloads."""
+    futures: deque[Future[list[Any]]] = deque()
+    for batch in chunked(items, BATCH_SIZE):
+        futures.append(executor.submit(validate_batch, batch, validator))
+        if len(futures) >= workers * 2:
+            yield from futures.popleft().result()
+    while futures:
+        yield from futures.popleft().result()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
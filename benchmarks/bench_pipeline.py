@@ -0,0 +1,128 @@
+"""
+Throughput and peak memory of every import and export stage for logbooks
+of different sizes.
+
+Each stage runs twice: timed, and with `tracemalloc` for peak memory, because
+tracing slows it down. Saved records are rolled back after each run.
+
+    python -m benchmarks.bench_pipeline [count ...]
+
+e.g. `python -m benchmarks.bench_pipeline 10000 100000 1000000`.
+"""
+
+import sys
+import tempfile
+from typing import Any, Callable, Type
+
+from benchmarks.utils import measure, measure_memory, report, setup_django
+
+
+setup_django()
+
+from django.db import transaction  # noqa: E402
+
+from exporter.services import CSVTemplateRenderer, CSVWriter  # noqa: E402
+from importer.services import (  # noqa: E402
+    JsonFileReader,
+    JsonStreamFileReader,
+    validate_items,
+)
+from pilotlog.exporter.services import generate_logbook_template  # noqa: E402
+from pilotlog.importer.entities import LogRecordEntity  # noqa: E402
+from pilotlog.importer.generator import (  # noqa: E402
+    LogbookGenerator,
+    write_log_records,
+)
+from pilotlog.importer.services import (  # noqa: E402
+    PilotlogCopySaver,
+    PilotlogDBSaver,
+    PilotlogJsonValidator,
+)
+
+
+COUNTS = [10_000, 100_000]
+
+
+class Rollback(Exception):
+    pass
+
+
+def rolled_back(func: Callable[[], object]) -> Callable[[], None]:
+    def _func() -> None:
+        try:
+            with transaction.atomic():
+                func()
+                raise Rollback
+        except Rollback:
+            pass
+
+    return _func
+
+
+def run_stage(name: str, count: int, func: Callable[[], object]) -> None:
+    report(
+        name,
+        count,
+        measure(func, repeat=1),
+        peak_memory=measure_memory(func),
+    )
+
+
+def main(*counts: int) -> None:
+    for count in counts or COUNTS:
+        # about 7% of records of a logbook are not flights
+        generator = LogbookGenerator(flights=count * 100 // 107)
+        with tempfile.TemporaryFile("w+b") as file:
+            with open(file.fileno(), "w", closefd=False) as text_file:
+                count = write_log_records(generator.generate(), text_file)
+            print(f"{count:,} records")
+            file.seek(0)
+            data = file.read()
+            bench_import(count, file, data)
+            bench_export(count, JsonFileReader().read(data))
+        print()
+
+
+def bench_import(count: int, file: Any, data: bytes) -> None:
+    def read_stream() -> None:
+        file.seek(0)
+        for _ in JsonStreamFileReader().read(file):
+            pass
+
+    run_stage("JsonFileReader.read", count, lambda: JsonFileReader().read(data))
+    run_stage("JsonStreamFileReader.read", count, read_stream)
+
+    items = JsonFileReader().read(data)
+    validator = PilotlogJsonValidator()
+    run_stage("validate_items", count, lambda: list(validate_items(items, validator)))
+
+    validated_items = list(validate_items(items, validator))
+    savers: list[Type[PilotlogDBSaver]] = [PilotlogDBSaver, PilotlogCopySaver]
+    for saver in savers:
+        run_stage(
+            f"{saver.__name__}.save",
+            count,
+            rolled_back(lambda: save(saver, validated_items)),
+        )
+
+
+def bench_export(count: int, items: list[dict[str, Any]]) -> None:
+    def export() -> None:
+        template = generate_logbook_template()
+        rendered_data = CSVTemplateRenderer().render(template=template)
+        for _ in CSVWriter(buffer_size=64 * 1024).write(data=rendered_data):
+            pass
+
+    def save_and_export() -> None:
+        save(PilotlogCopySaver, list(validate_items(items, PilotlogJsonValidator())))
+        run_stage("generate_logbook_template + render + write", count, export)
+
+    rolled_back(save_and_export)()
+
+
+def save(saver: Type[PilotlogDBSaver], items: list[LogRecordEntity]) -> None:
+    saver(chunk_size=5_000).save(iter(items))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
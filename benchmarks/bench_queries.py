@@ -0,0 +1,127 @@
+"""
+EXPLAIN ANALYZE of import and export queries with and without the indexes
+added for them. Generated log records are saved in a transaction, indexes are
+dropped in it too, and everything is rolled back at the end.
+
+    python -m benchmarks.bench_queries [count]
+"""
+
+import re
+import sys
+from datetime import UTC, datetime
+
+from benchmarks.utils import setup_django
+
+
+setup_django()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import F, QuerySet  # noqa: E402
+
+from importer.services import validate_items  # noqa: E402
+from pilotlog.importer.entities import TableType  # noqa: E402
+from pilotlog.importer.services import (  # noqa: E402
+    PilotlogCopySaver,
+    PilotlogJsonValidator,
+)
+from pilotlog.models import Aircraft, Flight, LogRecord  # noqa: E402
+from tests.factories import build_log_record_data  # noqa: E402
+
+
+USERS = 100
+# 2024-05-18, generated records are modified a second apart
+MODIFIED = 1716000000
+
+
+class Rollback(Exception):
+    pass
+
+
+def generate_items(count: int):
+    for i in range(count):
+        table = TableType.AIRCRAFT if i % 10 == 0 else TableType.FLIGHT
+        yield build_log_record_data(
+            table,
+            meta={"Record_Modified": MODIFIED + i},
+            user_id=i % USERS + 1,
+            _modified=MODIFIED + i,
+        )
+
+
+def get_queries(count: int) -> dict[str, QuerySet]:
+    guids = list(LogRecord.objects.order_by("?").values_list("guid", flat=True)[:100])
+    since = datetime.fromtimestamp(MODIFIED + count * 0.99, tz=UTC)
+    last_pk = Flight.objects.order_by("pk").values_list("pk", flat=True)[count // 2]
+    return {
+        "import: changed records of 100": LogRecord.objects.filter(
+            guid__in=guids
+        ).values_list("guid", "table", "modified"),
+        "user records": LogRecord.objects.filter(
+            user_id=2, table=TableType.FLIGHT
+        ).values_list("guid", flat=True),
+        "export: flights since": Flight.objects.data_for_export(since),
+        "export: aircraft since": Aircraft.objects.data_for_export(since),
+        "export: last modified flight": Flight.objects.order_by(
+            "-record_modified"
+        ).values("record_modified")[:1],
+        "export: flights keyset page": Flight.objects.data_for_export()
+        .annotate(export_pk=F("pk"))
+        .order_by("pk")
+        .filter(pk__gt=last_pk)[:2_000],
+    }
+
+
+def explain(queryset: QuerySet, repeat: int = 3) -> tuple[float, str]:
+    """Best execution time in ms and the first scan of the plan."""
+    execution_time = float("inf")
+    for _ in range(repeat):
+        plan = queryset.explain(analyze=True)
+        execution_time = min(
+            execution_time,
+            float(re.search(r"Execution Time: ([\d.]+) ms", plan)[1]),
+        )
+    # the first scan shows whether an index is used
+    scan = next(line for line in plan.splitlines() if "Scan" in line)
+    return execution_time, scan.split("  (")[0].strip(" ->")
+
+
+def drop_indexes() -> None:
+    with connection.schema_editor() as schema_editor:
+        for model in (Aircraft, Flight, LogRecord):
+            for index in model._meta.indexes:
+                schema_editor.remove_index(model, index)
+            for constraint in model._meta.constraints:
+                schema_editor.remove_constraint(model, constraint)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+
+def main(count: int = 100_000) -> None:
+    try:
+        with transaction.atomic():
+            PilotlogCopySaver(chunk_size=10_000).save(
+                validate_items(generate_items(count), PilotlogJsonValidator())
+            )
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+            queries = get_queries(count)
+            with_indexes = {name: explain(qs) for name, qs in queries.items()}
+            drop_indexes()
+            without_indexes = {name: explain(qs) for name, qs in queries.items()}
+
+            print(f"{'query':<35} {'indexed, ms':>12} {'not indexed, ms':>16}")
+            for name in queries:
+                (time, plan), (time_without, plan_without) = (
+                    with_indexes[name],
+                    without_indexes[name],
+                )
+                print(f"{name:<35} {time:>12.2f} {time_without:>16.2f}")
+                print(f"    {plan}\n    {plan_without}")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""
+Validation throughput of `PilotlogJsonValidator`.
+
+    python -m benchmarks.bench_validation [count]
+"""
+
+import json
+import sys
+
+from benchmarks.utils import measure, report, setup_django
+
+
+setup_django()
+
+from importer.services import validate_batch  # noqa: E402
+from pilotlog.importer.entities import LogRecordEntity, TableType  # noqa: E402
+from pilotlog.importer.services import PilotlogJsonValidator  # noqa: E402
+from tests.factories import build_log_record_data  # noqa: E402
+
+
+def main(count: int = 10_000) -> None:
+    tables = [table for table in TableType if table != TableType.AIRPORT]
+    items = [build_log_record_data(tables[i % len(tables)]) for i in range(count)]
+    data = json.dumps(items)
+    validator = PilotlogJsonValidator()
+
+    def validate_with_model() -> list[LogRecordEntity]:
+        # validation before the cached type adapters were introduced
+        return [LogRecordEntity(**validator.get_data_for_model(item)) for item in items]
+
+    report("model per item (before)", count, measure(validate_with_model))
+    report(
+        "type adapter per item",
+        count,
+        measure(lambda: [validator.validate(item) for item in items]),
+    )
+    report(
+        "type adapter batch", count, measure(lambda: validate_batch(items, validator))
+    )
+    report(
+        "json.loads + type adapter batch",
+        count,
+        measure(lambda: validator.validate_many(json.loads(data))),
+    )
+    report(
+        "type adapter batch from JSON",
+        count,
+        measure(lambda: validator.validate_json(data)),
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    for path in (ROOT_DIR, ROOT_DIR / "src"):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "apexive.settings")
+
+    import django
+
+    django.setup()
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> float:
+    """Best time of `repeat` runs in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure_memory(func: Callable[[], object]) -> int:
+    """
+    Peak memory allocated by Python during `func` run in bytes, memory allocated
+    by C libraries (e.g. database driver buffers) is not traced.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def report(
+    name: str,
+    count: int,
+    seconds: float,
+    unit: str = "records",
+    peak_memory: int | None = None,
+) -> None:
+    line = f"{name:<45} {count / seconds:>12,.0f} {unit}/s"
+    if peak_memory is not None:
+        line += f" {peak_memory / 1024**2:>10,.1f} MB peak"
+    print(line)
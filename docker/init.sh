@@ -1,3 +1,7 @@
 #!/bin/bash
 
 ./src/manage.py migrate  --no-input --traceback
+
+if [[ ${DB_PARTITIONS:-0} -gt 0 ]]; then
+    ./src/manage.py partition_tables --partitions "${DB_PARTITIONS}"
+fi
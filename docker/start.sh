@@ -6,11 +6,13 @@ bash docker/init.sh
 if [[ $ENVIRONMENT == "local" ]]; then
     exec python ./src/manage.py runserver 0.0.0.0:${APP_PORT} --traceback
 else
+    # ASGI workers stream async exports without holding a worker per download
     GUNICORN_ARGS=(
         "--bind=0.0.0.0:8000"
         "--timeout=${GUNICORN_TIMEOUT:-180}"
         "--workers=${GUNICORN_WORKERS:-2}"
+        "--worker-class=uvicorn_worker.UvicornWorker"
         "--reload"
     )
-    DJANGO_SETTINGS_MODULE=apexive.settings GUNICORN_CMD_ARGS="${GUNICORN_ARGS[*]}" exec gunicorn apexive.wsgi
+    DJANGO_SETTINGS_MODULE=apexive.settings GUNICORN_CMD_ARGS="${GUNICORN_ARGS[*]}" exec gunicorn apexive.asgi:application
 fi
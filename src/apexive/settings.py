@@ -91,4 +91,35 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_ROOT = env.path("MEDIA_ROOT", default=BASE_DIR / "media")
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Pilotlog
+
+# number of log records saved to the database at once during import
+IMPORT_CHUNK_SIZE = env.int("IMPORT_CHUNK_SIZE", default=5_000)
+# number of log records committed at once with a checkpoint to resume a failed import,
+# the whole import is a single transaction if 0
+IMPORT_COMMIT_SIZE = env.int("IMPORT_COMMIT_SIZE", default=0)
+# number of processes validating log records, validation is sequential if 1
+IMPORT_VALIDATION_WORKERS = env.int("IMPORT_VALIDATION_WORKERS", default=1)
+# seconds after the last heartbeat of a running import job, when its worker is
+# considered dead and the job is pending again, or failed after max attempts
+IMPORT_JOB_TIMEOUT = env.int("IMPORT_JOB_TIMEOUT", default=300)
+IMPORT_JOB_MAX_ATTEMPTS = env.int("IMPORT_JOB_MAX_ATTEMPTS", default=3)
+# how export rows are fetched: "cursor" (server-side cursor) or "keyset" (pagination)
+EXPORT_FETCH_STRATEGY = env.str("EXPORT_FETCH_STRATEGY", default="cursor")
+# number of rows fetched from the database at once during export
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2_000)
+# size of chunks the export response is streamed in
+EXPORT_BUFFER_SIZE = env.int("EXPORT_BUFFER_SIZE", default=64 * 1024)
+# number of rows in Parquet row group or Arrow record batch of columnar export
+EXPORT_BATCH_SIZE = env.int("EXPORT_BATCH_SIZE", default=50_000)
+# exports are cached in the directory until data is changed, least recently used
+# ones are removed above the max size in bytes, 0 disables the cache
+EXPORT_CACHE_DIR = env.path("EXPORT_CACHE_DIR", default=BASE_DIR / "export_cache")
+EXPORT_CACHE_MAX_SIZE = env.int("EXPORT_CACHE_MAX_SIZE", default=1024**3)
+# number of hash partitions by user of the biggest tables, 0 keeps them unpartitioned
+DB_PARTITIONS = env.int("DB_PARTITIONS", default=0)
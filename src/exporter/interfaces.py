@@ -5,6 +5,9 @@ from exporter.types import Template
 
 
 class Writer(metaclass=abc.ABCMeta):
+    content_type: str
+    file_extension: str
+
     @abc.abstractmethod
     def write(self, data: Iterable[Any]) -> Iterator[Any]: ...
 
@@ -12,3 +15,23 @@ class Writer(metaclass=abc.ABCMeta):
 class TemplateRenderer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def render(self, template: Template) -> Iterator[list[Any]]: ...
+
+
+class Compressor(metaclass=abc.ABCMeta):
+    # content coding name, as in `Accept-Encoding` header
+    encoding: str
+    # used when compressed file is downloaded as is
+    content_type: str
+    file_extension: str
+
+    @abc.abstractmethod
+    def compress(self, data: Iterable[bytes]) -> Iterator[bytes]: ...
+
+
+class ExportCache(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def get(self, key: str) -> Iterator[bytes] | None: ...
+
+    @abc.abstractmethod
+    def set(self, key: str, content: Iterable[bytes]) -> Iterator[bytes]:
+        """Yields content, it's cached once it's fully consumed."""
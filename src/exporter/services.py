@@ -1,8 +1,26 @@
 import csv
-from typing import Any, Iterable, Iterator
+import io
+import os
+import tempfile
+import zlib
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
 
-from exporter.interfaces import TemplateRenderer, Writer
-from exporter.types import Template
+from exporter.interfaces import Compressor, ExportCache, TemplateRenderer, Writer
+from exporter.types import HeaderFieldType, Table, Template
+
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
 
 
 class Echo:
@@ -11,14 +29,42 @@ class Echo:
 
 
 class CSVWriter(Writer):
-    def __init__(self):
+    """
+    Yields a line per row, or if `buffer_size` is set, lines encoded to bytes
+    in chunks of about `buffer_size` characters, so a response is streamed with
+    far fewer iterations and socket writes.
+    """
+
+    content_type = "text/csv"
+    file_extension = ".csv"
+
+    def __init__(self, buffer_size: int | None = None, encoding: str = "utf-8"):
         self.pseudo_buffer = Echo()
+        self.buffer_size = buffer_size
+        self.encoding = encoding
 
     def write(self, data: Iterable[Any]) -> Iterator[Any]:
+        if self.buffer_size:
+            yield from self.write_buffered(data, self.buffer_size)
+            return
+
         writer = csv.writer(self.pseudo_buffer)
         for row in data:
             yield writer.writerow(row)
 
+    def write_buffered(self, data: Iterable[Any], buffer_size: int) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in data:
+            writer.writerow(row)
+            if buffer.tell() >= buffer_size:
+                yield buffer.getvalue().encode(self.encoding)
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode(self.encoding)
+
 
 class CSVTemplateRenderer(TemplateRenderer):
     def render(self, template: Template) -> Iterator[list[Any]]:
@@ -44,7 +90,7 @@ class CSVTemplateRenderer(TemplateRenderer):
             yield [header.name for header in table.headers]
 
             # rows
-            for row in table.rows:
+            for row in table.iter_rows():
                 yield [row.get(header.name, "") for header in table.headers]
 
             yield self.get_empty_line(columns_num)
@@ -52,3 +98,289 @@ class CSVTemplateRenderer(TemplateRenderer):
     @staticmethod
     def get_empty_line(columns_num: int) -> list[str]:
         return [""] * columns_num
+
+
+class ArrowTableRenderer:
+    """
+    Renders table rows to Arrow record batches of `batch_size` rows, columns are
+    typed by header field type, empty values are nulls. Requires `pyarrow` package.
+    """
+
+    TEXT_FIELD_TYPES = {
+        HeaderFieldType.TEXT,
+        HeaderFieldType.PACKED_DETAIL,
+        # "hhmm" is kept as it is written
+        HeaderFieldType.TIME,
+    }
+
+    def __init__(self, batch_size: int = 10_000):
+        self.batch_size = batch_size
+
+    def render(self, table: Table) -> Iterator["pyarrow.RecordBatch"]:
+        schema = self.get_schema(table)
+        rows = iter(table.iter_rows())
+        # at least one batch, so a writer knows the schema of an empty table
+        batch = list(islice(rows, self.batch_size))
+        while True:
+            yield pyarrow.record_batch(
+                [
+                    self.get_column(
+                        [
+                            self.get_value(row.get(field.name), table, i)
+                            for row in batch
+                        ],
+                        field.type,
+                    )
+                    for i, field in enumerate(schema)
+                ],
+                schema=schema,
+            )
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+
+    def get_schema(self, table: Table) -> "pyarrow.Schema":
+        types = {
+            HeaderFieldType.NUMBER: pyarrow.int64(),
+            HeaderFieldType.YEAR: pyarrow.int16(),
+            HeaderFieldType.BOOLEAN: pyarrow.bool_(),
+            HeaderFieldType.DATE: pyarrow.date32(),
+            HeaderFieldType.DECIMAL: pyarrow.float64(),
+            HeaderFieldType.DATE_TIME: pyarrow.timestamp("us", tz="UTC"),
+        }
+        return pyarrow.schema(
+            [
+                (header.name, types.get(header.field_type, pyarrow.string()))
+                for header in table.headers
+            ]
+        )
+
+    @staticmethod
+    def get_column(values: list[Any], data_type: "pyarrow.DataType") -> "pyarrow.Array":
+        try:
+            return pyarrow.array(values, type=data_type)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            # e.g. date or number as string, parsed by arrow
+            strings = [value if value is None else str(value) for value in values]
+            return pyarrow.array(strings, type=pyarrow.string()).cast(data_type)
+
+    def get_value(self, value: Any, table: Table, index: int) -> Any:
+        if value is None or value == "":
+            return None
+        if table.headers[index].field_type in self.TEXT_FIELD_TYPES:
+            return str(value)
+        return value
+
+
+class StreamBuffer(io.RawIOBase):
+    """
+    Write-only file, which content is taken out by `pop`, so a file can be
+    streamed while it is written. Position is kept, as writers rely on it.
+    """
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def pop(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ArrowIPCWriter(Writer):
+    """Writes record batches of the same schema as Arrow IPC stream."""
+
+    content_type = "application/vnd.apache.arrow.stream"
+    file_extension = ".arrows"
+
+    def write(self, data: Iterable["pyarrow.RecordBatch"]) -> Iterator[bytes]:
+        buffer = StreamBuffer()
+        writer = None
+        for batch in data:
+            if writer is None:
+                writer = pyarrow.ipc.new_stream(buffer, batch.schema)
+            writer.write_batch(batch)
+            yield buffer.pop()
+
+        if writer is not None:
+            writer.close()
+            yield buffer.pop()
+
+
+class ParquetWriter(Writer):
+    """Writes record batches of the same schema as Parquet file, batch per row group."""
+
+    content_type = "application/vnd.apache.parquet"
+    file_extension = ".parquet"
+
+    def write(self, data: Iterable["pyarrow.RecordBatch"]) -> Iterator[bytes]:
+        buffer = StreamBuffer()
+        writer = None
+        for batch in data:
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(buffer, batch.schema)
+            writer.write_batch(batch)
+            yield buffer.pop()
+
+        if writer is not None:
+            writer.close()
+            yield buffer.pop()
+
+
+class GzipCompressor(Compressor):
+    encoding = "gzip"
+    content_type = "application/gzip"
+    file_extension = ".gz"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(self.level, wbits=zlib.MAX_WBITS | 16)
+        for chunk in data:
+            if compressed := compressor.compress(chunk):
+                yield compressed
+        yield compressor.flush()
+
+
+class ZstdCompressor(Compressor):
+    """Requires `zstandard` package."""
+
+    encoding = "zstd"
+    content_type = "application/zstd"
+    file_extension = ".zst"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def compress(self, data: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in data:
+            if compressed := compressor.compress(chunk):
+                yield compressed
+        yield compressor.flush()
+
+
+def encode_chunks(
+    chunks: Iterable[str | bytes], encoding: str = "utf-8"
+) -> Iterator[bytes]:
+    """
+    Encodes text chunks to bytes, e.g. lines of unbuffered `CSVWriter`,
+    so they can be compressed and cached.
+    """
+    for chunk in chunks:
+        yield chunk.encode(encoding) if isinstance(chunk, str) else chunk
+
+
+# writers of record batches rendered by `ArrowTableRenderer`
+COLUMNAR_WRITERS: dict[str, type[Writer]] = (
+    {"parquet": ParquetWriter, "arrow": ArrowIPCWriter} if pyarrow is not None else {}
+)
+
+COMPRESSORS: dict[str, type[Compressor]] = {
+    compressor.encoding: compressor
+    for compressor in (ZstdCompressor, GzipCompressor)
+    if compressor is not ZstdCompressor or zstandard is not None
+}
+
+
+def negotiate_compressor(accept_encoding: str) -> Compressor | None:
+    """
+    Picks a compressor for `Accept-Encoding` header value, preferring the ones
+    with higher quality, then zstd over gzip. Returns None for identity.
+    """
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        qualities[name.strip().lower()] = quality
+
+    candidates = [
+        (qualities.get(encoding, qualities.get("*", 0.0)), encoding)
+        for encoding in COMPRESSORS
+    ]
+    quality, encoding = max(
+        candidates, key=lambda candidate: candidate[0], default=(0.0, None)
+    )
+    if not quality:
+        return None
+    return COMPRESSORS[encoding]()
+
+
+class FileExportCache(ExportCache):
+    """
+    Stores exports as files in `directory`. Once their total size exceeds
+    `max_size` bytes, the least recently used ones are removed.
+    """
+
+    def __init__(self, directory: Path, max_size: int, chunk_size: int = 64 * 1024):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+
+    def get(self, key: str) -> Iterator[bytes] | None:
+        path = self.directory / key
+        try:
+            file = path.open("rb")
+            # modification time is the last usage time
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return self.read(file)
+
+    def set(self, key: str, content: Iterable[bytes]) -> Iterator[bytes]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file first, so incomplete export is never read
+        file = tempfile.NamedTemporaryFile(dir=self.directory, prefix=".", delete=False)
+        try:
+            with file:
+                for chunk in content:
+                    file.write(chunk)
+                    yield chunk
+            os.replace(file.name, self.directory / key)
+        except BaseException:
+            # including a client disconnect, which closes the generator
+            os.unlink(file.name)
+            raise
+        self.evict()
+
+    def read(self, file: IO[bytes]) -> Iterator[bytes]:
+        with file:
+            while chunk := file.read(self.chunk_size):
+                yield chunk
+
+    def evict(self) -> None:
+        files = []
+        for path in self.directory.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
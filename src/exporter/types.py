@@ -1,7 +1,10 @@
 from enum import StrEnum
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 
-from pydantic import BaseModel
+from pydantic import BaseModel, SkipValidation
+
+
+Rows = Iterable[dict[str, Any]]
 
 
 class HeaderFieldType(StrEnum):
@@ -25,7 +28,12 @@ class Header(BaseModel):
 class Table(BaseModel):
     name: str
     headers: list[Header]
-    rows: list[dict[str, Any]]
+    # rows are not validated to keep them lazy, a callable is called on rendering,
+    # so e.g. a database cursor is opened only when the table is reached
+    rows: SkipValidation[Rows | Callable[[], Rows]]
+
+    def iter_rows(self) -> Rows:
+        return self.rows() if callable(self.rows) else self.rows
 
 
 class Template(BaseModel):
@@ -0,0 +1,18 @@
+from typing import Any
+
+
+class ItemValidationError(ValueError):
+    """Error of a single item validation with the item index in the input."""
+
+    def __init__(self, index: int, item: Any, error: Exception):
+        super().__init__(index, item, error)
+        self.index = index
+        self.item = item
+        self.error = error
+
+    def __str__(self) -> str:
+        return f"Item {self.index} is invalid: {self.error}"
+
+
+class ImportInProgressError(RuntimeError):
+    """Import of the same data is run by another process at the same time."""
@@ -1,6 +1,9 @@
 import abc
-from typing import Any, Generic, Iterator, Type
+from typing import Any, Generic, Iterable, Iterator, Type
 
+from pydantic import ValidationError
+
+from importer.exceptions import ItemValidationError
 from importer.types import PydanticModel_T
 
 
@@ -16,6 +19,9 @@ class JsonValidator(Generic[PydanticModel_T], metaclass=abc.ABCMeta):
         data = self.get_data_for_model(item)
         return self.pydantic_model(**data)
 
+    def validate_many(self, items: list[dict[str, Any]]) -> list[PydanticModel_T]:
+        return [self.validate(item) for item in items]
+
     @abc.abstractmethod
     def get_data_for_model(self, item: dict[str, Any]) -> dict[str, Any]: ...
 
@@ -23,3 +29,31 @@ class JsonValidator(Generic[PydanticModel_T], metaclass=abc.ABCMeta):
 class Saver(Generic[PydanticModel_T], metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def save(self, items: Iterator[PydanticModel_T]) -> None: ...
+
+
+class ErrorReport(metaclass=abc.ABCMeta):
+    """Report of invalid items, which are skipped instead of failing the import."""
+
+    def __init__(self, item_fields: Iterable[str] = ()):
+        # fields of the item added to its errors to identify it
+        self.item_fields = list(item_fields)
+        self.count = 0
+
+    def add(self, error: ItemValidationError) -> None:
+        self.count += 1
+        self.write(self.get_error_data(error))
+
+    def get_error_data(self, error: ItemValidationError) -> dict[str, Any]:
+        item = error.item if isinstance(error.item, dict) else {}
+        if isinstance(error.error, ValidationError):
+            errors = error.error.errors(include_url=False, include_input=False)
+        else:
+            errors = [{"type": type(error.error).__name__, "msg": str(error.error)}]
+        return {
+            "index": error.index,
+            **{field: item.get(field) for field in self.item_fields},
+            "errors": errors,
+        }
+
+    @abc.abstractmethod
+    def write(self, error_data: dict[str, Any]) -> None: ...
@@ -1,10 +1,36 @@
+import codecs
 import json
-from typing import Any, Iterator
+import types
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from enum import Enum
+from functools import cache
+from itertools import count, islice
+from multiprocessing import get_context
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+from uuid import UUID, SafeUUID
 
-from importer.interfaces import FileReader, JsonValidator
+from pydantic import BaseModel
+
+from importer.exceptions import ItemValidationError
+from importer.interfaces import ErrorReport, FileReader, JsonValidator
 from importer.types import PydanticModel_T
 
 
+T = TypeVar("T")
+
+
 class JsonFileReader(FileReader):
     def read(self, data: str | bytes) -> Any:
         if isinstance(data, bytes):
@@ -12,8 +38,355 @@ class JsonFileReader(FileReader):
         return json.loads(data.replace('\\"', '"'))
 
 
+class JsonStreamFileReader(FileReader):
+    """
+    Reads JSON document chunk by chunk and yields items of the top-level array
+    one at a time, so memory usage does not depend on the document size.
+
+    Escaped quotes are unescaped per chunk the same way `JsonFileReader` does it
+    for the whole document. If the top-level value is not an array, it's yielded
+    as a single item.
+    """
+
+    WHITESPACE = " \t\n\r"
+    DELIMITERS = WHITESPACE + ",]"
+
+    def __init__(self, chunk_size: int = 64 * 1024):
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+
+    def read(self, data: str | bytes | IO[Any]) -> Iterator[Any]:
+        chunks = self.iter_text_chunks(data)
+        buffer, position = "", 0
+
+        def load_more() -> bool:
+            nonlocal buffer, position
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            buffer, position = buffer[position:] + chunk, 0
+            return True
+
+        def next_token() -> str | None:
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in self.WHITESPACE:
+                    position += 1
+                if position < len(buffer):
+                    return buffer[position]
+                if not load_more():
+                    return None
+
+        def decode_value() -> Any:
+            nonlocal position
+            next_token()
+            while True:
+                try:
+                    value, end = self.decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if load_more():
+                        continue
+                    raise
+                # value not followed by a delimiter can be truncated (e.g. number)
+                if end == len(buffer) or buffer[end] not in self.DELIMITERS:
+                    if load_more():
+                        continue
+                position = end
+                return value
+
+        token = next_token()
+        if token != "[":
+            if token is None:
+                raise json.JSONDecodeError("Expecting value", buffer, position)
+            while load_more():
+                pass
+            yield self.decoder.decode(buffer[position:])
+            return
+
+        position += 1
+        if next_token() == "]":
+            position += 1
+        else:
+            while True:
+                yield decode_value()
+                token = next_token()
+                position += 1
+                if token == "]":
+                    break
+                if token != ",":
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", buffer, position - 1
+                    )
+
+        if next_token() is not None:
+            raise json.JSONDecodeError("Extra data", buffer, position)
+
+    def iter_text_chunks(self, data: str | bytes | IO[Any]) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        # keep trailing backslash for the next chunk,
+        # it can be the first half of an escaped quote
+        tail = ""
+        for chunk in self.iter_raw_chunks(data):
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk)
+            chunk = tail + chunk
+            tail = ""
+            if chunk.endswith("\\"):
+                chunk, tail = chunk[:-1], chunk[-1]
+            if chunk:
+                yield chunk.replace('\\"', '"')
+
+        tail += decoder.decode(b"", final=True)
+        if tail:
+            yield tail.replace('\\"', '"')
+
+    def iter_raw_chunks(self, data: str | bytes | IO[Any]) -> Iterator[str | bytes]:
+        if isinstance(data, (str, bytes)):
+            for i in range(0, len(data), self.chunk_size):
+                yield data[i : i + self.chunk_size]
+            return
+
+        while chunk := data.read(self.chunk_size):
+            yield chunk
+
+
+class ListErrorReport(ErrorReport):
+    def __init__(self, item_fields: Iterable[str] = ()):
+        super().__init__(item_fields)
+        self.errors: list[dict[str, Any]] = []
+
+    def write(self, error_data: dict[str, Any]) -> None:
+        self.errors.append(error_data)
+
+
+class JsonLinesErrorReport(ErrorReport):
+    """Writes errors to the file as soon as they are found, one JSON per line."""
+
+    def __init__(self, file: IO[str], item_fields: Iterable[str] = ()):
+        super().__init__(item_fields)
+        self.file = file
+
+    def write(self, error_data: dict[str, Any]) -> None:
+        self.file.write(json.dumps(error_data, default=str) + "\n")
+
+
 def validate_items(
-    items: list[dict[str, Any]], json_validator: JsonValidator[PydanticModel_T]
+    items: Iterable[dict[str, Any]],
+    json_validator: JsonValidator[PydanticModel_T],
+    error_report: ErrorReport | None = None,
+    indexes: Iterable[int] | None = None,
+) -> Iterator[PydanticModel_T]:
+    """
+    Invalid items are skipped and added to `error_report` with their index
+    from `indexes` (counted from 0 by default), they raise if there is no report.
+    """
+    for index, item in zip(count() if indexes is None else indexes, items):
+        if error_report is None:
+            yield json_validator.validate(item)
+            continue
+        try:
+            validated_item = json_validator.validate(item)
+        except Exception as e:
+            error_report.add(ItemValidationError(index, item, e))
+            continue
+        yield validated_item
+
+
+def validate_items_in_parallel(
+    items: Iterable[dict[str, Any]],
+    json_validator: JsonValidator[PydanticModel_T],
+    workers: int,
+    batch_size: int = 1_000,
+    initializer: Callable[[], Any] | None = None,
+    executor: ProcessPoolExecutor | None = None,
+    error_report: ErrorReport | None = None,
+    indexes: Iterable[int] | None = None,
 ) -> Iterator[PydanticModel_T]:
-    for item in items:
-        yield json_validator.validate(item)
+    """
+    Validates items in batches with a pool of processes, keeping the input order.
+    Only a few batches per worker are in flight, so memory usage stays bounded.
+
+    Processes are spawned, `initializer` can be used to set up each of them.
+    `executor` of `create_validation_executor` can be passed to reuse processes.
+    Invalid item raises `ItemValidationError` with the item index from `indexes`,
+    or it's skipped and added to `error_report` if it's given.
+    """
+    indexed_items = zip(count() if indexes is None else indexes, items)
+    with (
+        nullcontext(executor)
+        if executor
+        else create_validation_executor(workers, initializer)
+    ) as executor:
+        futures: deque[Future[list[tuple | ItemValidationError]]] = deque()
+        for batch in chunked(indexed_items, batch_size):
+            futures.append(
+                executor.submit(
+                    validate_batch_to_payloads,
+                    [item for _, item in batch],
+                    json_validator,
+                    [index for index, _ in batch],
+                    skip_invalid=error_report is not None,
+                )
+            )
+            if len(futures) >= workers * 2:
+                yield from report_errors(
+                    load_payloads(futures.popleft().result()), error_report
+                )
+
+        while futures:
+            yield from report_errors(
+                load_payloads(futures.popleft().result()), error_report
+            )
+
+
+def create_validation_executor(
+    workers: int, initializer: Callable[[], Any] | None = None
+) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context("spawn"), initializer=initializer
+    )
+
+
+def validate_batch(
+    items: list[dict[str, Any]],
+    json_validator: JsonValidator[PydanticModel_T],
+    indexes: Iterable[int] | None = None,
+    skip_invalid: bool = False,
+) -> list[PydanticModel_T | ItemValidationError]:
+    """
+    Invalid item raises `ItemValidationError` with its index from `indexes`,
+    or the error is returned in place of the item if `skip_invalid` is set.
+    """
+    try:
+        return json_validator.validate_many(items)
+    except Exception:
+        pass
+
+    # find invalid items to report them
+    results: list[PydanticModel_T | ItemValidationError] = []
+    for index, item in zip(count() if indexes is None else indexes, items):
+        try:
+            results.append(json_validator.validate(item))
+        except Exception as e:
+            if not skip_invalid:
+                raise ItemValidationError(index, item, e) from e
+            results.append(ItemValidationError(index, item, e))
+    if not skip_invalid:
+        raise AssertionError("Batch is invalid, but all items are valid")
+    return results
+
+
+def validate_batch_to_payloads(
+    items: list[dict[str, Any]],
+    json_validator: JsonValidator[PydanticModel_T],
+    indexes: Iterable[int] | None = None,
+    skip_invalid: bool = False,
+) -> list[tuple | ItemValidationError]:
+    """
+    `validate_batch` run by a worker process, validated models are returned
+    as `dump_model` payloads, which are much cheaper to send to the parent.
+    """
+    return [
+        result if isinstance(result, ItemValidationError) else dump_model(result)
+        for result in validate_batch(items, json_validator, indexes, skip_invalid)
+    ]
+
+
+def load_payloads(
+    results: list[tuple | ItemValidationError],
+) -> list[BaseModel | ItemValidationError]:
+    return [
+        result if isinstance(result, ItemValidationError) else load_model(result)
+        for result in results
+    ]
+
+
+def dump_model(model: BaseModel) -> tuple:
+    """
+    Picklable payload of a validated model: its class and values of its fields.
+    UUIDs are dumped as ints and enums as their values, because unpickling them
+    is slower than validation, nested models are dumped recursively.
+    """
+    return (
+        type(model),
+        {name: dump_value(value) for name, value in model.__dict__.items()},
+    )
+
+
+def dump_value(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return dump_model(value)
+    if isinstance(value, UUID):
+        return value.int
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def load_model(payload: tuple) -> BaseModel:
+    """Rebuilds a model from `dump_model` payload without validating it again."""
+    model_class, data = payload
+    for name, load in get_field_loaders(model_class):
+        if (value := data[name]) is not None:
+            data[name] = load(value)
+    model = model_class.__new__(model_class)
+    # the same state as of a validated model, it's set on unpickling too
+    model.__setstate__(
+        {
+            "__dict__": data,
+            "__pydantic_fields_set__": set(data),
+            "__pydantic_extra__": None,
+            "__pydantic_private__": None,
+        }
+    )
+    return model
+
+
+@cache
+def get_field_loaders(
+    model_class: type[BaseModel],
+) -> list[tuple[str, Callable[[Any], Any]]]:
+    """Fields with functions rebuilding their dumped values, if it's needed."""
+    field_loaders = []
+    for name, field in model_class.model_fields.items():
+        annotation = field.annotation
+        # optional fields are loaded as their type, None is kept as is
+        if get_origin(annotation) in (Union, types.UnionType):
+            args = [arg for arg in get_args(annotation) if arg is not type(None)]
+            if len(args) == 1:
+                annotation = args[0]
+        if annotation is UUID:
+            field_loaders.append((name, uuid_from_int))
+        elif isinstance(annotation, type) and issubclass(annotation, Enum):
+            field_loaders.append((name, annotation))
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            field_loaders.append((name, load_model))
+    return field_loaders
+
+
+UUID_IS_SAFE_UNKNOWN = SafeUUID.unknown  # enum attribute lookup is slow
+
+
+def uuid_from_int(value: int) -> UUID:
+    # the same as UUID(int=value) without checks of arguments, which are slow
+    uuid = object.__new__(UUID)
+    object.__setattr__(uuid, "int", value)
+    object.__setattr__(uuid, "is_safe", UUID_IS_SAFE_UNKNOWN)
+    return uuid
+
+
+def report_errors(
+    results: list[PydanticModel_T | ItemValidationError],
+    error_report: ErrorReport | None,
+) -> Iterator[PydanticModel_T]:
+    for result in results:
+        if isinstance(result, ItemValidationError):
+            error_report.add(result)
+        else:
+            yield result
+
+
+def chunked(items: Iterable[T], chunk_size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
@@ -8,3 +8,14 @@ PydanticModel_T = TypeVar("PydanticModel_T", bound=BaseModel)
 
 class Entity(BaseModel):
     pass
+
+
+class ImportStats(BaseModel):
+    new: int = 0
+    changed: int = 0
+    skipped: int = 0
+
+
+class ImportProgress(BaseModel):
+    processed: int = 0
+    table_counts: dict[str, int] = {}
@@ -1,30 +1,119 @@
 from pathlib import Path
+from typing import Any
 
 from django.core.files import File
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from importer.services import JsonFileReader, validate_items
-from pilotlog.importer.services import PilotlogDBSaver, PilotlogJsonValidator
+from exporter.services import COLUMNAR_WRITERS, COMPRESSORS
+from importer.services import ListErrorReport
+from pilotlog.exporter.constants import LOGBOOK_TABLES
+from pilotlog.importer.services import SAVERS, import_log_records
+from pilotlog.models import ImportJob
 
 
-class ImportSerializer(serializers.Serializer):
+class ImportStatsSerializer(serializers.Serializer):
+    new = serializers.IntegerField()
+    changed = serializers.IntegerField()
+    skipped = serializers.IntegerField()
+
+
+class ImportParamsSerializer(serializers.Serializer):
     file = serializers.FileField(write_only=True)
+    saver = serializers.ChoiceField(
+        choices=list(SAVERS), default="orm", write_only=True
+    )
+    upsert = serializers.BooleanField(default=False, write_only=True)
+    # skip records which were not modified since the previous import
+    delta = serializers.BooleanField(default=False, write_only=True)
+    # commit records in batches of the size, failed import of the file is resumed
+    commit_size = serializers.IntegerField(min_value=0, required=False, write_only=True)
+    # skip invalid records and report their errors instead of failing the import
+    skip_invalid = serializers.BooleanField(default=False, write_only=True)
 
     def validate_file(self, file: File) -> File:
         if Path(file.name).suffix != ".json":
             raise ValidationError("Invalid file type")
         return file
 
-    def save(self) -> None:
-        file_content = self.validated_data["file"].read()
 
-        reader = JsonFileReader()
-        json_validator = PilotlogJsonValidator()
-        db_saver = PilotlogDBSaver()
+class ImportSerializer(ImportParamsSerializer):
+    stats = ImportStatsSerializer(read_only=True)
+    # errors of skipped invalid records: index, guid, table and validation errors
+    errors = serializers.ListField(child=serializers.DictField(), read_only=True)
+
+    def save(self) -> dict[str, Any]:
+        params = {**self.validated_data}
+        error_report = (
+            ListErrorReport(item_fields=["guid", "table"])
+            if params.pop("skip_invalid")
+            else None
+        )
+        stats = import_log_records(error_report=error_report, **params)
+
+        self.instance = {
+            "stats": stats,
+            "errors": error_report.errors if error_report else [],
+        }
+        return self.instance
+
 
-        json_log_records = reader.read(file_content)
-        pydantic_log_records = validate_items(
-            items=json_log_records, json_validator=json_validator
+class ImportJobSerializer(ImportParamsSerializer, serializers.ModelSerializer):
+    stats = ImportStatsSerializer(read_only=True)
+    throughput = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = (
+            "id",
+            "file",
+            "saver",
+            "upsert",
+            "delta",
+            "commit_size",
+            "skip_invalid",
+            "status",
+            "processed",
+            "table_counts",
+            "throughput",
+            "stats",
+            "error",
+            "invalid",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = (
+            "status",
+            "processed",
+            "table_counts",
+            "error",
+            "invalid",
+            "created_at",
+            "started_at",
+            "finished_at",
         )
-        db_saver.save(items=pydantic_log_records)
+
+    def create(self, validated_data: dict[str, Any]) -> ImportJob:
+        file = validated_data.pop("file")
+        return ImportJob.objects.create(file=file, params=validated_data)
+
+    def get_throughput(self, job: ImportJob) -> float | None:
+        """Processed records per second."""
+        if job.started_at is None:
+            return None
+        elapsed = ((job.finished_at or timezone.now()) - job.started_at).total_seconds()
+        return round(job.processed / elapsed, 2) if elapsed else None
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(choices=["csv", *COLUMNAR_WRITERS], default="csv")
+    # columnar formats have a single schema, so only one table is exported
+    table = serializers.ChoiceField(choices=LOGBOOK_TABLES, default="flights")
+    # export only rows modified at or after the time
+    since = serializers.DateTimeField(required=False)
+    # export only data of the user, as `user_id` of imported log records
+    user_id = serializers.IntegerField(min_value=0, required=False)
+    # export compressed file, otherwise response is compressed by `Accept-Encoding`
+    compression = serializers.ChoiceField(choices=list(COMPRESSORS), required=False)
@@ -1,9 +1,28 @@
 from django.urls import path
 
-from pilotlog.api.views import ExportView, ImportView
+from pilotlog.api.views import (
+    AsyncExportView,
+    ExportView,
+    ImportJobDetailView,
+    ImportJobErrorReportView,
+    ImportJobView,
+    ImportView,
+)
 
 
 urlpatterns = [
     path("import/", ImportView.as_view(), name="import"),
+    path("import/jobs/", ImportJobView.as_view(), name="import-jobs"),
+    path(
+        "import/jobs/<uuid:pk>/",
+        ImportJobDetailView.as_view(),
+        name="import-job-detail",
+    ),
+    path(
+        "import/jobs/<uuid:pk>/errors/",
+        ImportJobErrorReportView.as_view(),
+        name="import-job-errors",
+    ),
     path("export/", ExportView.as_view(), name="export"),
+    path("export/async/", AsyncExportView.as_view(), name="export-async"),
 ]
@@ -1,12 +1,48 @@
-from django.http import StreamingHttpResponse
-from rest_framework.generics import CreateAPIView
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterable, Iterator, TypeVar
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import (
+    FileResponse,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views import View
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import CreateAPIView, RetrieveAPIView
 from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.views import APIView
 
-from exporter.services import CSVTemplateRenderer, CSVWriter
-from pilotlog.api.serializers import ImportSerializer
-from pilotlog.exporter.services import generate_logbook_template
+from exporter.services import (
+    COLUMNAR_WRITERS,
+    COMPRESSORS,
+    ArrowTableRenderer,
+    CSVTemplateRenderer,
+    CSVWriter,
+    FileExportCache,
+    encode_chunks,
+    negotiate_compressor,
+)
+from pilotlog.api.serializers import (
+    ExportParamsSerializer,
+    ImportJobSerializer,
+    ImportSerializer,
+)
+from pilotlog.exporter.services import generate_logbook_template, get_export_key
+from pilotlog.models import ImportJob
+
+
+T = TypeVar("T")
 
 
 class ImportView(CreateAPIView):
@@ -14,17 +50,173 @@ class ImportView(CreateAPIView):
     serializer_class = ImportSerializer
 
 
-class ExportView(APIView):
-    def get(self, request: Request) -> StreamingHttpResponse:
-        csv_writer = CSVWriter()
-        csv_template_renderer = CSVTemplateRenderer()
+class ImportJobView(CreateAPIView):
+    """Stores the file and returns a job, which is run by `run_import_worker`."""
+
+    permission_classes = (AllowAny,)
+    serializer_class = ImportJobSerializer
+
+
+class ImportJobDetailView(RetrieveAPIView):
+    permission_classes = (AllowAny,)
+    serializer_class = ImportJobSerializer
+    queryset = ImportJob.objects.all()
+
 
-        logbook_template = generate_logbook_template()
-        rendered_data = csv_template_renderer.render(template=logbook_template)
+class ImportJobErrorReportView(RetrieveAPIView):
+    """Streams JSON lines report of invalid log records skipped by the job."""
 
-        response = StreamingHttpResponse(
-            csv_writer.write(data=rendered_data), content_type="text/csv"
+    permission_classes = (AllowAny,)
+    queryset = ImportJob.objects.all()
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        job = self.get_object()
+        if not job.error_report:
+            raise NotFound("Job has no error report")
+        return FileResponse(
+            job.error_report.open("rb"), content_type="application/x-ndjson"
         )
-        response["Content-Disposition"] = 'attachment; filename="export.csv"'
 
+
+class ExportView(APIView):
+    def perform_content_negotiation(self, request: Request, force: bool = False):
+        # `format` query parameter is the export format, not a renderer
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request: Request) -> HttpResponse:
+        params_serializer = ExportParamsSerializer(data=request.query_params)
+        params_serializer.is_valid(raise_exception=True)
+
+        return get_export_response(request, params_serializer.validated_data)
+
+
+class AsyncExportView(View):
+    """
+    Export for ASGI servers, which doesn't hold a worker while the export is
+    downloaded. Rows are fetched by the sync export in a thread of the response,
+    so the event loop isn't blocked and the database cursor stays in one thread.
+    WSGI servers buffer the whole async response, so they are redirected
+    to the sync export, which is streamed by them.
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        if not isinstance(request, ASGIRequest):
+            query = request.GET.urlencode()
+            return HttpResponseRedirect(
+                reverse("export") + (f"?{query}" if query else "")
+            )
+
+        params_serializer = ExportParamsSerializer(data=request.GET)
+        if not params_serializer.is_valid():
+            return JsonResponse(params_serializer.errors, status=400)
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                executor,
+                get_export_response,
+                request,
+                params_serializer.validated_data,
+            )
+        except BaseException:
+            await shutdown_executor(executor)
+            raise
+
+        if isinstance(response, StreamingHttpResponse):
+            response.streaming_content = iterate_in_executor(
+                response.streaming_content, executor
+            )
+        else:
+            await shutdown_executor(executor)
         return response
+
+
+async def iterate_in_executor(
+    iterable: Iterable[T], executor: ThreadPoolExecutor
+) -> AsyncIterator[T]:
+    """Iterates in the single thread of the executor, shuts it down at the end."""
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+    end = object()
+    try:
+        while (
+            item := await loop.run_in_executor(executor, next, iterator, end)
+        ) is not end:
+            yield item
+    finally:
+        await shutdown_executor(executor, iterator)
+
+
+async def shutdown_executor(
+    executor: ThreadPoolExecutor, iterator: Iterator[Any] | None = None
+) -> None:
+    """Closes the iterator and database connections in the thread of the executor."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, close_iterator, iterator)
+    executor.shutdown(wait=False)
+
+
+def close_iterator(iterator: Iterator[Any] | None) -> None:
+    try:
+        if close := getattr(iterator, "close", None):
+            close()
+    finally:
+        connections.close_all()
+
+
+def get_export_response(request: HttpRequest, params: dict[str, Any]) -> HttpResponse:
+    tables = None if params["format"] == "csv" else [params["table"]]
+    logbook_template = generate_logbook_template(
+        tables=tables, since=params.get("since"), user_id=params.get("user_id")
+    )
+    if params["format"] == "csv":
+        writer = CSVWriter(buffer_size=settings.EXPORT_BUFFER_SIZE)
+        rendered_data = CSVTemplateRenderer().render(template=logbook_template)
+    else:
+        writer = COLUMNAR_WRITERS[params["format"]]()
+        rendered_data = ArrowTableRenderer(
+            batch_size=settings.EXPORT_BATCH_SIZE
+        ).render(table=logbook_template.tables[0])
+
+    content = encode_chunks(writer.write(data=rendered_data))
+    content_type, content_encoding = writer.content_type, None
+    filename = f"export{writer.file_extension}"
+
+    if compression := params.get("compression"):
+        compressor = COMPRESSORS[compression]()
+        content = compressor.compress(content)
+        content_type = compressor.content_type
+        filename += compressor.file_extension
+    elif compressor := negotiate_compressor(request.headers.get("Accept-Encoding", "")):
+        content = compressor.compress(content)
+        content_encoding = compressor.encoding
+
+    export_key = get_export_key(
+        tables,
+        params.get("user_id"),
+        format=params["format"],
+        since=params.get("since"),
+        compression=params.get("compression"),
+        content_encoding=content_encoding,
+    )
+    etag = quote_etag(export_key)
+    if not_modified_response := get_conditional_response(request, etag=etag):
+        not_modified_response["ETag"] = etag
+        return not_modified_response
+
+    if settings.EXPORT_CACHE_MAX_SIZE:
+        export_cache = FileExportCache(
+            settings.EXPORT_CACHE_DIR, settings.EXPORT_CACHE_MAX_SIZE
+        )
+        cached_content = export_cache.get(export_key)
+        content = cached_content or export_cache.set(export_key, content)
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["ETag"] = etag
+    if content_encoding:
+        response["Content-Encoding"] = content_encoding
+    patch_vary_headers(response, ["Accept-Encoding"])
+
+    return response
@@ -1,6 +1,8 @@
 from exporter.types import Header, HeaderFieldType
 
 
+LOGBOOK_TABLES = ["aircraft", "flights"]
+
 AIRCRAFT_TABLE_HEADERS = [
     Header(name="AircraftID", field_type=HeaderFieldType.TEXT),
     Header(name="EquipmentType", field_type=HeaderFieldType.TEXT),
@@ -1,21 +1,114 @@
+import hashlib
+import json
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Collection, Iterator
+
+from django.conf import settings
+from django.db.models import Count, F, Max, Model, QuerySet
+
 from exporter.types import Table, Template
 from pilotlog.exporter.constants import AIRCRAFT_TABLE_HEADERS, FLIGHT_TABLE_HEADERS
-from pilotlog.models import Aircraft, Flight
+from pilotlog.models import Aircraft, AirField, Flight, Pilot
 
 
-def generate_logbook_template() -> Template:
+def generate_logbook_template(
+    fetch_strategy: str | None = None,
+    chunk_size: int | None = None,
+    tables: Collection[str] | None = None,
+    since: datetime | None = None,
+    user_id: int | None = None,
+) -> Template:
+    """
+    `tables` are keys of `LOGBOOK_TABLES` to include, all if not set.
+    If `since` is set, only rows modified at or after it are included,
+    if `user_id` is set, only rows of the user.
+    """
+    iter_rows = partial(
+        FETCH_STRATEGIES[fetch_strategy or settings.EXPORT_FETCH_STRATEGY],
+        chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE,
+    )
+    logbook_tables = {
+        "aircraft": Table(
+            name="Aircraft Table",
+            headers=AIRCRAFT_TABLE_HEADERS,
+            rows=partial(iter_rows, Aircraft.objects.data_for_export(since, user_id)),
+        ),
+        "flights": Table(
+            name="Flights Table",
+            headers=FLIGHT_TABLE_HEADERS,
+            rows=partial(iter_rows, Flight.objects.data_for_export(since, user_id)),
+        ),
+    }
     return Template(
         name="ForeFlight Logbook Import",
         tables=[
-            Table(
-                name="Aircraft Table",
-                headers=AIRCRAFT_TABLE_HEADERS,
-                rows=Aircraft.objects.data_for_export().iterator(chunk_size=100),
-            ),
-            Table(
-                name="Flights Table",
-                headers=FLIGHT_TABLE_HEADERS,
-                rows=Flight.objects.data_for_export().iterator(chunk_size=100),
-            ),
+            table
+            for key, table in logbook_tables.items()
+            if tables is None or key in tables
         ],
     )
+
+
+def get_export_key(
+    tables: Collection[str] | None = None, user_id: int | None = None, **params: Any
+) -> str:
+    """
+    Key of export of `tables` (all if not set) of `user_id` (all users if not set)
+    with `params`, it changes when any exported record is created, modified or deleted.
+    It's based on the server's update time of records, `record_modified` is set by
+    devices, so a record can be updated with an older value than of other records.
+    """
+    fingerprint = []
+    for model in get_exported_models(tables):
+        queryset = model.objects.all()
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        fingerprint.append(
+            queryset.aggregate(count=Count("pk"), updated_at=Max("updated_at"))
+        )
+    data = json.dumps([fingerprint, user_id, params], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def get_exported_models(tables: Collection[str] | None = None) -> list[type[Model]]:
+    # flights contain pilots and departure airfield data
+    table_models = {"aircraft": [Aircraft], "flights": [Flight, Pilot, AirField]}
+    return [
+        model
+        for table, models in table_models.items()
+        if tables is None or table in tables
+        for model in models
+    ]
+
+
+def iter_rows_with_cursor(
+    queryset: QuerySet, chunk_size: int
+) -> Iterator[dict[str, Any]]:
+    """Fetches rows with a server-side cursor, `chunk_size` rows per round-trip."""
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def iter_rows_with_keyset(
+    queryset: QuerySet, chunk_size: int
+) -> Iterator[dict[str, Any]]:
+    """
+    Fetches rows page by page ordered by primary key, each page starts after
+    the last key of the previous one, so no cursor or transaction is kept open.
+    """
+    queryset = queryset.annotate(export_pk=F("pk")).order_by("pk")
+    page = list(queryset[:chunk_size])
+    while page:
+        last_pk = page[-1]["export_pk"]
+        for row in page:
+            del row["export_pk"]
+            yield row
+        if len(page) < chunk_size:
+            break
+        page = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+
+
+FETCH_STRATEGIES: dict[str, Callable[..., Iterator[dict[str, Any]]]] = {
+    "cursor": iter_rows_with_cursor,
+    "keyset": iter_rows_with_keyset,
+}
@@ -262,3 +262,44 @@ class SettingConfigEntity(RecordModifiedMixin):
     data: str = Field(..., alias="Data")
     name: str = Field(..., alias="Name")
     group: str = Field(..., alias="Group")
+
+
+# log records with specific meta entity, validated in a single call
+class AirFieldLogRecordEntity(LogRecordEntity):
+    meta: AirFieldEntity
+
+
+class AirCraftLogRecordEntity(LogRecordEntity):
+    meta: AirCraftEntity
+
+
+class PilotLogRecordEntity(LogRecordEntity):
+    meta: PilotEntity
+
+
+class FlightLogRecordEntity(LogRecordEntity):
+    meta: FlightEntity
+
+
+class ImagePicLogRecordEntity(LogRecordEntity):
+    meta: ImagePicEntity
+
+
+class LimitRulesLogRecordEntity(LogRecordEntity):
+    meta: LimitRulesEntity
+
+
+class MyQueryLogRecordEntity(LogRecordEntity):
+    meta: MyQueryEntity
+
+
+class MyQueryBuildLogRecordEntity(LogRecordEntity):
+    meta: MyQueryBuildEntity
+
+
+class QualificationLogRecordEntity(LogRecordEntity):
+    meta: QualificationEntity
+
+
+class SettingConfigLogRecordEntity(LogRecordEntity):
+    meta: SettingConfigEntity
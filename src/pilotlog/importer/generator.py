@@ -0,0 +1,311 @@
+"""
+Synthetic logbooks for load and scale testing, as raw log records of import files.
+"""
+
+import json
+import random
+import string
+import types
+import uuid
+from copy import deepcopy
+from datetime import UTC, date, datetime, time, timedelta
+from functools import cache
+from typing import IO, Any, Callable, Iterable, Iterator, Type
+
+from importer.types import Entity
+from pilotlog.importer.entities import TableType
+from pilotlog.importer.services import PilotlogJsonValidator
+
+
+WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliett", "kilo", "lima", "mike", "november", "oscar", "papa",
+]  # fmt: skip
+AIRCRAFT_MODELS = [
+    ("Cessna", "172S"),
+    ("Piper", "PA-28"),
+    ("Diamond", "DA40"),
+    ("Cirrus", "SR22"),
+    ("Airbus", "A320"),
+    ("Boeing", "737-800"),
+    ("Embraer", "E190"),
+]
+FIRST_NAMES = ["Anna", "Ben", "Carla", "Dmytro", "Emma", "Felix", "Olena", "Sam"]
+LAST_NAMES = ["Smith", "Kovalenko", "Garcia", "Muller", "Rossi", "Brown", "Novak"]
+
+DAY = 24 * 60 * 60
+# logbooks span 10 years from the start date
+START_DATE = date(2015, 1, 1)
+START_TIME = int(datetime.combine(START_DATE, time(), tzinfo=UTC).timestamp())
+PERIOD_DAYS = 3_650
+
+
+class LogbookGenerator:
+    """
+    Generates logbooks of `users` users with `flights` flights each and records
+    of other tables in realistic ratios, as raw log records of an import file.
+    Records are yielded one by one, so logbooks of any size can be streamed
+    to a file, and they are the same for the same `seed`.
+
+    References point to records of the same logbook, pilots go after flights,
+    so they are resolved after the flights are saved. `dangling_ratio` of
+    references point to records which don't exist. `duplicate_ratio` of records
+    are repeated with a later modification time, so they can only be imported
+    with upsert. Logbook of the next `revision` has the same records, but
+    `changed_ratio` of them are modified later, to test re-imports.
+    """
+
+    FLIGHTS_PER_PILOT = 1_000
+    FLIGHTS_PER_AIRCRAFT = 500
+    FLIGHTS_PER_AIRFIELD = 20
+    FLIGHTS_PER_IMAGE = 50
+    # records per logbook
+    QUALIFICATIONS = 10
+    LIMIT_RULES = 5
+    MY_QUERIES = 5
+    BUILDS_PER_QUERY = 3
+    SETTINGS = 20
+
+    def __init__(
+        self,
+        users: int = 1,
+        flights: int = 1_000,
+        seed: int = 0,
+        dangling_ratio: float = 0.01,
+        duplicate_ratio: float = 0.0,
+        revision: int = 0,
+        changed_ratio: float = 0.1,
+        first_user_id: int = 1,
+    ):
+        self.users = users
+        self.flights = flights
+        self.dangling_ratio = dangling_ratio
+        self.duplicate_ratio = duplicate_ratio
+        self.revision = revision
+        self.changed_ratio = changed_ratio
+        self.first_user_id = first_user_id
+        # separate generators, so records are the same for any ratios and revisions
+        self.random = random.Random(seed)
+        self.dangling_random = random.Random(f"{seed}:dangling")
+        self.duplicate_random = random.Random(f"{seed}:duplicate")
+        self.changed_random = random.Random(f"{seed}:changed")
+
+    def generate(self) -> Iterator[dict[str, Any]]:
+        for user_id in range(self.first_user_id, self.first_user_id + self.users):
+            for log_record in self.generate_logbook(user_id):
+                yield log_record
+                if self.duplicate_random.random() < self.duplicate_ratio:
+                    yield self.build_duplicate(log_record)
+
+    def generate_logbook(self, user_id: int) -> Iterator[dict[str, Any]]:
+        rng = self.random
+        airfield_codes = self.generate_codes(self.flights // self.FLIGHTS_PER_AIRFIELD)
+        aircraft_codes = self.generate_codes(self.flights // self.FLIGHTS_PER_AIRCRAFT)
+        pilot_codes = self.generate_codes(self.flights // self.FLIGHTS_PER_PILOT)
+        flight_codes = []
+
+        for code in range(1, self.SETTINGS + 1):
+            yield self.build_log_record(
+                user_id,
+                TableType.SETTING_CONFIG,
+                # setting codes are small numbers of a device, the same for all users
+                {"ConfigCode": code},
+            )
+        for code in airfield_codes:
+            yield self.build_log_record(
+                user_id,
+                TableType.AIRFIELD,
+                {
+                    "AFCode": code,
+                    "AFICAO": self.random_letters(4),
+                    "AFIATA": self.random_letters(3),
+                    "AFName": f"{rng.choice(WORDS).capitalize()} Airfield",
+                    "Latitude": round(rng.uniform(-60, 70), 6),
+                    "Longitude": round(rng.uniform(-180, 180), 6),
+                },
+            )
+        for code in aircraft_codes:
+            make, model = rng.choice(AIRCRAFT_MODELS)
+            yield self.build_log_record(
+                user_id,
+                TableType.AIRCRAFT,
+                {
+                    "AircraftCode": code,
+                    "Make": make,
+                    "Model": model,
+                    "Reference": f"N{rng.randrange(100, 1000)}{self.random_letters(2)}",
+                },
+            )
+        for _ in range(self.MY_QUERIES):
+            query_code = self.generate_code()
+            yield self.build_log_record(
+                user_id, TableType.MY_QUERY, {"mQCode": query_code}
+            )
+            for _ in range(self.BUILDS_PER_QUERY):
+                yield self.build_log_record(
+                    user_id,
+                    TableType.MY_QUERY_BUILD,
+                    {"mQCode": self.reference(query_code)},
+                )
+        for _ in range(self.QUALIFICATIONS):
+            yield self.build_log_record(
+                user_id,
+                TableType.QUALIFICATION,
+                {"RefAirfield": self.reference(rng.choice(airfield_codes))},
+            )
+        for _ in range(self.LIMIT_RULES):
+            l_from = START_DATE + timedelta(rng.randrange(PERIOD_DAYS))
+            yield self.build_log_record(
+                user_id,
+                TableType.LIMIT_RULES,
+                {
+                    "LFrom": l_from.isoformat(),
+                    "LTo": (l_from + timedelta(365)).isoformat(),
+                },
+            )
+
+        for i in range(self.flights):
+            flight_code = self.generate_code()
+            flight_codes.append(flight_code)
+            dep_code, arr_code = rng.sample(airfield_codes, 2)
+            crew = [rng.choice(pilot_codes) for _ in range(4)]
+            minutes = rng.randrange(30, 600)
+            # flights are evenly spread over the period
+            day = i * PERIOD_DAYS // self.flights
+            yield self.build_log_record(
+                user_id,
+                TableType.FLIGHT,
+                {
+                    "FlightCode": flight_code,
+                    "DateUTC": (START_DATE + timedelta(day)).isoformat(),
+                    "AircraftCode": self.reference(rng.choice(aircraft_codes)),
+                    "DepCode": self.reference(dep_code),
+                    "ArrCode": self.reference(arr_code),
+                    **{
+                        f"P{n}Code": self.reference(pilot_code)
+                        for n, pilot_code in enumerate(crew, 1)
+                    },
+                    "minTOTAL": minutes,
+                    "minAIR": minutes,
+                    "FlightNumber": f"{self.random_letters(2)}{rng.randrange(1, 9999)}",
+                },
+                modified=START_TIME + day * DAY,
+            )
+        for code in pilot_codes:
+            yield self.build_log_record(
+                user_id,
+                TableType.PILOT,
+                {
+                    "PilotCode": code,
+                    "PilotName": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                },
+            )
+        for _ in range(self.flights // self.FLIGHTS_PER_IMAGE):
+            yield self.build_log_record(
+                user_id,
+                TableType.IMAGE_PIC,
+                {"LinkCode": rng.choice(flight_codes), "FileExt": "jpg"},
+            )
+
+    def build_log_record(
+        self,
+        user_id: int,
+        table: TableType,
+        meta: dict[str, Any],
+        modified: int | None = None,
+    ) -> dict[str, Any]:
+        entity = PilotlogJsonValidator.TABLE_TYPE_TO_ENTITY[table]
+        meta = {
+            alias: factory(self.random)
+            for alias, factory in get_field_factories(entity)
+            if alias not in meta
+        } | meta
+        if modified is None:
+            modified = START_TIME + self.random.randrange(PERIOD_DAYS * DAY)
+        if self.revision and self.changed_random.random() < self.changed_ratio:
+            modified += self.revision * DAY
+        meta["Record_Modified"] = modified
+
+        return {
+            "user_id": user_id,
+            "guid": str(meta[entity.model_fields["code"].alias]),
+            "table": table.value.capitalize(),
+            "meta": meta,
+            "platform": 9,
+            "_modified": modified,
+        }
+
+    @staticmethod
+    def build_duplicate(log_record: dict[str, Any]) -> dict[str, Any]:
+        """The same log record modified a second later."""
+        duplicate = deepcopy(log_record)
+        duplicate["_modified"] += 1
+        duplicate["meta"]["Record_Modified"] += 1
+        return duplicate
+
+    def generate_code(self, rng: random.Random | None = None) -> str:
+        return str(uuid.UUID(int=(rng or self.random).getrandbits(128), version=4))
+
+    def generate_codes(self, count: int, min_count: int = 2) -> list[str]:
+        return [self.generate_code() for _ in range(max(count, min_count))]
+
+    def reference(self, code: str) -> str:
+        """Code of the referenced record, or of a record which doesn't exist."""
+        if self.dangling_random.random() < self.dangling_ratio:
+            return self.generate_code(self.dangling_random)
+        return code
+
+    def random_letters(self, count: int) -> str:
+        return "".join(self.random.choices(string.ascii_uppercase, k=count))
+
+
+@cache
+def get_field_factories(
+    entity: Type[Entity],
+) -> list[tuple[str, Callable[[random.Random], Any]]]:
+    """Functions generating a random JSON value of each field of the entity by alias."""
+    factories = []
+    for field in entity.model_fields.values():
+        annotation = field.annotation
+        optional = isinstance(annotation, types.UnionType)
+        if optional:
+            annotation = next(
+                arg for arg in annotation.__args__ if arg is not type(None)
+            )
+        factory = VALUE_FACTORIES[annotation]
+        if optional:
+            factory = make_optional(factory)
+        factories.append((field.alias, factory))
+    return factories
+
+
+def make_optional(
+    factory: Callable[[random.Random], Any]
+) -> Callable[[random.Random], Any]:
+    return lambda rng: factory(rng) if rng.random() < 0.5 else None
+
+
+VALUE_FACTORIES: dict[type, Callable[[random.Random], Any]] = {
+    str: lambda rng: rng.choice(WORDS),
+    int: lambda rng: rng.randrange(1_000),
+    float: lambda rng: round(rng.uniform(0, 1_000), 2),
+    bool: lambda rng: rng.random() < 0.5,
+    date: lambda rng: (START_DATE + timedelta(rng.randrange(PERIOD_DAYS))).isoformat(),
+    datetime: lambda rng: START_TIME + rng.randrange(PERIOD_DAYS * DAY),
+    uuid.UUID: lambda rng: str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+}
+
+
+def write_log_records(log_records: Iterable[dict[str, Any]], file: IO[str]) -> int:
+    """
+    Writes log records as JSON array one by one, so they aren't kept in memory.
+    Returns the number of written records.
+    """
+    count = 0
+    file.write("[")
+    for count, log_record in enumerate(log_records, 1):
+        if count > 1:
+            file.write(",\n")
+        file.write(json.dumps(log_record))
+    file.write("]")
+    return count
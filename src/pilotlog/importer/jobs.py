@@ -0,0 +1,134 @@
+import tempfile
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from importer.services import JsonLinesErrorReport
+from importer.types import ImportProgress
+from pilotlog.importer.services import import_log_records
+from pilotlog.models import ImportJob
+
+
+def claim_next_job() -> ImportJob | None:
+    """
+    Marks the oldest pending job as running, skips jobs locked by other workers.
+    Stale running jobs are recovered first, see `recover_stale_jobs`.
+    """
+    recover_stale_jobs()
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ImportJob.Status.PENDING)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = ImportJob.Status.RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "attempts"])
+    return job
+
+
+def recover_stale_jobs() -> int:
+    """
+    Running jobs without a heartbeat for `IMPORT_JOB_TIMEOUT` seconds, because
+    their worker died, are pending again, or failed after `IMPORT_JOB_MAX_ATTEMPTS`.
+    An import of a dead worker is rolled back or resumed from its checkpoint,
+    so it's safe to run again. Returns the number of recovered jobs.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT)
+    stale_jobs = ImportJob.objects.filter(
+        Q(heartbeat_at__lt=stale_before)
+        # jobs started before heartbeats
+        | Q(heartbeat_at__isnull=True, started_at__lt=stale_before),
+        status=ImportJob.Status.RUNNING,
+    )
+    failed = stale_jobs.filter(attempts__gte=settings.IMPORT_JOB_MAX_ATTEMPTS).update(
+        status=ImportJob.Status.FAILED,
+        error="Worker stopped responding",
+        finished_at=now,
+    )
+    return failed + stale_jobs.update(status=ImportJob.Status.PENDING)
+
+
+def run_import_job(job: ImportJob, progress_interval: float = 1.0) -> None:
+    """
+    Runs the import in a separate thread with its own database connection,
+    because the whole import is saved in a single transaction. Progress is saved
+    from the current thread, so it's visible while the import is running.
+    """
+    progress = ImportProgress()
+    params = {**job.params}
+    # invalid log records are written to the report file while importing
+    report_file = (
+        tempfile.TemporaryFile("w+", encoding="utf-8")
+        if params.pop("skip_invalid", False)
+        else None
+    )
+    error_report = (
+        JsonLinesErrorReport(report_file, item_fields=["guid", "table"])
+        if report_file
+        else None
+    )
+    result = {}
+
+    def _import() -> None:
+        try:
+            with job.file.open("rb") as file:
+                result["stats"] = import_log_records(
+                    file, progress=progress, error_report=error_report, **params
+                )
+        except Exception:
+            result["error"] = traceback.format_exc()
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=_import, name=f"import-job-{job.pk}")
+    thread.start()
+    while thread.is_alive():
+        thread.join(progress_interval)
+        save_progress(job, progress)
+
+    if "error" in result:
+        job.status = ImportJob.Status.FAILED
+        job.error = result["error"]
+    else:
+        job.status = ImportJob.Status.SUCCEEDED
+        if result["stats"] is not None:
+            job.stats = result["stats"].model_dump()
+        job.file.delete(save=False)
+    if error_report:
+        job.invalid = error_report.count
+        with report_file:
+            report_file.seek(0)
+            job.error_report.save(f"{job.pk}.jsonl", File(report_file), save=False)
+    job.finished_at = timezone.now()
+    save_progress(job, progress)
+    job.save(
+        update_fields=[
+            "status",
+            "error",
+            "stats",
+            "file",
+            "invalid",
+            "error_report",
+            "finished_at",
+        ]
+    )
+
+
+def save_progress(job: ImportJob, progress: ImportProgress) -> None:
+    job.processed = progress.processed
+    job.table_counts = dict(progress.table_counts)
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=["processed", "table_counts", "heartbeat_at"])
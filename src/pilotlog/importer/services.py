@@ -1,25 +1,54 @@
+import hashlib
 from collections import defaultdict
-from typing import Any, Iterator, Type
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from functools import cache, cached_property
+from graphlib import TopologicalSorter
+from itertools import islice, tee
+from typing import IO, Annotated, Any, Iterable, Iterator, Type, Union
 from uuid import UUID
 
-from django.db import transaction
+import django
+from django.conf import settings
+from django.db import connection, transaction
 from django.db.models import Model
-from pydantic import BaseModel
+from django.db.models.fields import AutoFieldMixin
+from django.utils import timezone
+from pydantic import BaseModel, Discriminator, Tag, TypeAdapter, ValidationError
 
-from importer.interfaces import JsonValidator, Saver
-from importer.types import Entity
+from importer.exceptions import ImportInProgressError
+from importer.interfaces import ErrorReport, JsonValidator, Saver
+from importer.services import (
+    JsonStreamFileReader,
+    chunked,
+    create_validation_executor,
+    validate_items,
+    validate_items_in_parallel,
+)
+from importer.types import Entity, ImportProgress, ImportStats
 from pilotlog.importer.entities import (
     AirCraftEntity,
+    AirCraftLogRecordEntity,
     AirFieldEntity,
+    AirFieldLogRecordEntity,
     FlightEntity,
+    FlightLogRecordEntity,
     ImagePicEntity,
+    ImagePicLogRecordEntity,
     LimitRulesEntity,
+    LimitRulesLogRecordEntity,
     LogRecordEntity,
     MyQueryBuildEntity,
+    MyQueryBuildLogRecordEntity,
     MyQueryEntity,
+    MyQueryLogRecordEntity,
     PilotEntity,
+    PilotLogRecordEntity,
     QualificationEntity,
+    QualificationLogRecordEntity,
     SettingConfigEntity,
+    SettingConfigLogRecordEntity,
     TableType,
 )
 from pilotlog.models import (
@@ -27,6 +56,8 @@ from pilotlog.models import (
     AirField,
     Flight,
     ImagePic,
+    ImportCheckpoint,
+    ImportPendingRelation,
     LimitRules,
     LogRecord,
     MyQuery,
@@ -35,6 +66,16 @@ from pilotlog.models import (
     Qualification,
     SettingConfig,
 )
+from pilotlog.partitioning import (
+    PARTITION_KEY,
+    get_partitioned_tables,
+    get_unique_fields,
+)
+
+
+DATETIME_ADAPTER = TypeAdapter(datetime)
+# FK values to set after related objects are saved, by (code, user_id) of objects
+PendingRelations = dict[TableType, dict[tuple[Any, int], dict[str, UUID | str]]]
 
 
 class PilotlogJsonValidator(JsonValidator[LogRecordEntity]):
@@ -51,6 +92,18 @@ class PilotlogJsonValidator(JsonValidator[LogRecordEntity]):
         TableType.QUALIFICATION: QualificationEntity,
         TableType.SETTING_CONFIG: SettingConfigEntity,
     }
+    TABLE_TYPE_TO_LOG_RECORD_ENTITY: dict[TableType, Type[LogRecordEntity]] = {
+        TableType.AIRFIELD: AirFieldLogRecordEntity,
+        TableType.AIRCRAFT: AirCraftLogRecordEntity,
+        TableType.PILOT: PilotLogRecordEntity,
+        TableType.FLIGHT: FlightLogRecordEntity,
+        TableType.IMAGE_PIC: ImagePicLogRecordEntity,
+        TableType.LIMIT_RULES: LimitRulesLogRecordEntity,
+        TableType.MY_QUERY: MyQueryLogRecordEntity,
+        TableType.MY_QUERY_BUILD: MyQueryBuildLogRecordEntity,
+        TableType.QUALIFICATION: QualificationLogRecordEntity,
+        TableType.SETTING_CONFIG: SettingConfigLogRecordEntity,
+    }
 
     def get_data_for_model(self, item: dict[str, Any]) -> dict[str, Any]:
         table = item["table"].lower()
@@ -60,11 +113,123 @@ class PilotlogJsonValidator(JsonValidator[LogRecordEntity]):
             "meta": self.TABLE_TYPE_TO_ENTITY[table](**item["meta"]),
         }
 
+    def validate(self, item: dict[str, Any]) -> LogRecordEntity:
+        return self.get_item_adapter().validate_python(item)
+
+    def validate_many(self, items: list[dict[str, Any]]) -> list[LogRecordEntity]:
+        return self.get_items_adapter().validate_python(items)
+
+    def validate_json(self, data: str | bytes) -> list[LogRecordEntity]:
+        """Validates JSON array of log records without decoding it beforehand."""
+        return self.get_items_adapter().validate_json(data)
+
+    @classmethod
+    @cache
+    def get_item_adapter(cls) -> TypeAdapter:
+        return TypeAdapter(cls.get_log_record_type())
+
+    @classmethod
+    @cache
+    def get_items_adapter(cls) -> TypeAdapter:
+        return TypeAdapter(list[cls.get_log_record_type()])
+
+    @classmethod
+    @cache
+    def get_log_record_type(cls) -> Any:
+        """
+        Union of `LogRecordEntity` subclasses discriminated by `table`,
+        so meta is validated with its specific entity in the same call.
+        """
+        log_record_entities = [
+            Annotated[entity, Tag(table)]
+            for table, entity in cls.TABLE_TYPE_TO_LOG_RECORD_ENTITY.items()
+        ]
+        return Annotated[
+            Union[tuple(log_record_entities)], Discriminator(get_table_tag)
+        ]
+
+
+def get_table_tag(item: Any) -> str | None:
+    if isinstance(item, dict):
+        table = item.get("table")
+        return table.lower() if isinstance(table, str) else None
+    return getattr(item, "table", None)
+
+
+def exclude_unchanged_items(
+    indexed_items: Iterable[tuple[int, dict[str, Any]]],
+    chunk_size: int,
+    stats: ImportStats,
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Yields raw log records with their indexes in the file, which are not saved
+    yet or were modified after the saved version, so unchanged records skip
+    validation and saving. Records which can't be compared with the saved ones
+    are yielded too, so validation reports them.
+    """
+    unique_fields = get_unique_fields(
+        LogRecord, LOG_RECORD_UNIQUE_FIELDS, get_partitioned_tables()
+    )
+    for chunk in chunked(indexed_items, chunk_size):
+        keys = [get_log_record_key(item, unique_fields) for _, item in chunk]
+        lookup_values = [key for key in keys if key is not None]
+        saved_records_modified = {
+            tuple(values[:-1]): values[-1]
+            for values in LogRecord.objects.filter(
+                **{
+                    f"{field_name}__in": {key[i] for key in lookup_values}
+                    for i, field_name in enumerate(unique_fields)
+                }
+            ).values_list(*unique_fields, "modified")
+        }
+        for (index, item), key in zip(chunk, keys):
+            if key is None:
+                yield index, item
+                continue
+            saved_modified = saved_records_modified.get(key)
+            if saved_modified is None:
+                stats.new += 1
+                yield index, item
+                continue
+            try:
+                modified = parse_modified(item["_modified"])
+            except (KeyError, ValidationError):
+                yield index, item
+                continue
+            if modified > saved_modified:
+                stats.changed += 1
+                yield index, item
+            else:
+                stats.skipped += 1
+
+
+def get_log_record_key(item: Any, unique_fields: list[str]) -> tuple | None:
+    """Values of `unique_fields` of a raw log record, None if it has no such."""
+    try:
+        return tuple(
+            item[field_name].lower() if field_name == "table" else item[field_name]
+            for field_name in unique_fields
+        )
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+# log records are unique per user, the same record can be imported by many users
+LOG_RECORD_UNIQUE_FIELDS = ["guid", "table", "user_id"]
+
+
+def parse_modified(value: Any) -> datetime:
+    modified = DATETIME_ADAPTER.validate_python(value)
+    if timezone.is_naive(modified):
+        modified = timezone.make_aware(modified)
+    return modified
+
 
 class ModelWithSaveParams(BaseModel):
     db_model: Type[Model]
     fk_fields: dict[str, str] = {}  # model_field: entity_field
     m2m_fields: dict[str, tuple[str, ...]] = {}  # model_field: (entity_field, ...)
+    unique_fields: list[str] = []  # primary key if not set
 
 
 class PilotlogDBSaver(Saver[LogRecordEntity]):
@@ -72,7 +237,9 @@ class PilotlogDBSaver(Saver[LogRecordEntity]):
     Saver class responsible for saving pilotlog model instances to the database.
 
     It uses the `TABLE_TYPE_TO_MODEL` mapping to map each table type to the
-    corresponding Django model.
+    corresponding Django model. Tables are saved in order of their `fk_fields`
+    dependencies, so foreign keys are set on creation. Only references to objects
+    saved by the next chunks are adjusted afterwards.
     """
 
     TABLE_TYPE_TO_MODEL = {
@@ -100,25 +267,97 @@ class PilotlogDBSaver(Saver[LogRecordEntity]):
         TableType.QUALIFICATION: ModelWithSaveParams(
             db_model=Qualification, fk_fields={"ref_airfield_id": "ref_airfield_code"}
         ),
-        TableType.SETTING_CONFIG: ModelWithSaveParams(db_model=SettingConfig),
+        TableType.SETTING_CONFIG: ModelWithSaveParams(
+            db_model=SettingConfig, unique_fields=["code", "user_id"]
+        ),
     }
 
+    def __init__(
+        self,
+        chunk_size: int | None = None,
+        upsert: bool = False,
+        progress: ImportProgress | None = None,
+    ):
+        # number of records saved at once, all records are saved at once if not set
+        self.chunk_size = chunk_size
+        # update existing records if they were modified instead of failing
+        self.upsert = upsert
+        # updated after each saved chunk
+        self.progress = progress
+        self.tables_in_save_order = self.get_tables_in_save_order()
+
     @transaction.atomic
     def save(self, items: Iterator[LogRecordEntity]) -> None:
-        log_records_to_create: list[LogRecord] = []
-        # {table_name: {code: {fk_field_name: value} } }
-        meta_items_to_adjust_fk = {
+        meta_items_to_adjust_fk = self.get_meta_items_to_adjust_fk()
+        self.save_chunks(items, meta_items_to_adjust_fk)
+        self.adjust_relations(meta_items_to_adjust_fk)
+
+    def get_meta_items_to_adjust_fk(
+        self, pending_relations: Iterable[ImportPendingRelation] = ()
+    ) -> PendingRelations:
+        """
+        FK values which were not resolved on creation, related objects can be saved
+        with the next chunks:
+        {table_name: {(code, user_id): {entity_fk_field_name: value} } }.
+        `pending_relations` are FK values stored by `dump_pending_relations`.
+        """
+        meta_items_to_adjust_fk: PendingRelations = {
             table: {}
             for table, model_with_save_params in self.TABLE_TYPE_TO_MODEL.items()
             if model_with_save_params.fk_fields
         }
-        db_model_to_db_entities_to_create: dict[Type[Model], list[Model]] = defaultdict(
-            list
-        )
+        for pending_relation in pending_relations:
+            model_with_save_params = self.TABLE_TYPE_TO_MODEL[pending_relation.table]
+            meta = model_with_save_params.db_model._meta
+            # JSON values are converted back to types of related primary keys
+            meta_items_to_adjust_fk[pending_relation.table][
+                (meta.pk.to_python(pending_relation.code), pending_relation.user_id)
+            ] = {
+                entity_field: meta.get_field(fk_field).target_field.to_python(
+                    pending_relation.fk_values[entity_field]
+                )
+                for fk_field, entity_field in model_with_save_params.fk_fields.items()
+                if entity_field in pending_relation.fk_values
+            }
+        return meta_items_to_adjust_fk
 
-        for item in items:
-            meta = item.meta
+    @staticmethod
+    def dump_pending_relations(
+        meta_items_to_adjust_fk: PendingRelations, checkpoint: ImportCheckpoint
+    ) -> list[ImportPendingRelation]:
+        return [
+            ImportPendingRelation(
+                checkpoint=checkpoint,
+                table=table,
+                code=str(code),
+                user_id=user_id,
+                fk_values={
+                    entity_field: str(value)
+                    for entity_field, value in fk_values.items()
+                },
+            )
+            for table, meta_items in meta_items_to_adjust_fk.items()
+            for (code, user_id), fk_values in meta_items.items()
+        ]
 
+    def save_chunks(
+        self,
+        items: Iterable[LogRecordEntity],
+        meta_items_to_adjust_fk: PendingRelations,
+    ) -> None:
+        chunks = chunked(items, self.chunk_size) if self.chunk_size else [items]
+        for chunk in chunks:
+            self.save_chunk(chunk, meta_items_to_adjust_fk)
+
+    def save_chunk(
+        self,
+        items: Iterable[LogRecordEntity],
+        meta_items_to_adjust_fk: PendingRelations,
+    ) -> None:
+        log_records_to_create: list[LogRecord] = []
+        table_to_items: dict[TableType, list[LogRecordEntity]] = defaultdict(list)
+
+        for item in items:
             # create LogRecord instance
             log_records_to_create.append(
                 LogRecord(
@@ -129,40 +368,198 @@ class PilotlogDBSaver(Saver[LogRecordEntity]):
                     )
                 )
             )
+            table_to_items[item.table].append(item)
 
-            # Exclude pydantic fields for db model
-            # Store meta item code with related fk codes to adjust foreign keys
-            model_with_save_params = self.TABLE_TYPE_TO_MODEL[item.table]
-            exclude_fields_for_db_model = set(model_with_save_params.fk_fields.values())
-            if exclude_fields_for_db_model:
-                meta_items_to_adjust_fk[item.table][meta.code] = meta.model_dump(
-                    include=exclude_fields_for_db_model
-                )
+        # save instances to db
+        if self.upsert:
+            self.bulk_upsert(
+                LogRecord,
+                log_records_to_create,
+                unique_fields=self.get_unique_fields(
+                    LogRecord, LOG_RECORD_UNIQUE_FIELDS
+                ),
+                modified_field="modified",
+            )
+        else:
+            self.bulk_create(
+                LogRecord,
+                log_records_to_create,
+                unique_fields=self.get_unique_fields(
+                    LogRecord, LOG_RECORD_UNIQUE_FIELDS
+                ),
+                ignore_conflicts=True,
+            )
+        # related tables are saved first, so FK fields can be set on creation
+        for table in self.tables_in_save_order:
+            if table_items := table_to_items.get(table):
+                self.save_meta_items(table, table_items, meta_items_to_adjust_fk)
 
-            # Create meta db model instance
-            db_model_to_db_entities_to_create[model_with_save_params.db_model].append(
-                model_with_save_params.db_model(
-                    **self.prepare_entity_for_save(
-                        meta,
-                        exclude_fields=exclude_fields_for_db_model,
-                    )
-                )
+        if self.progress is not None:
+            self.progress.processed += len(log_records_to_create)
+            for table, table_items in table_to_items.items():
+                self.progress.table_counts[table] = self.progress.table_counts.get(
+                    table, 0
+                ) + len(table_items)
+
+    def save_meta_items(
+        self,
+        table: TableType,
+        items: list[LogRecordEntity],
+        meta_items_to_adjust_fk: PendingRelations,
+    ) -> None:
+        """Saves meta of log records, owned by the same user as log records."""
+        model_with_save_params = self.TABLE_TYPE_TO_MODEL[table]
+        db_model = model_with_save_params.db_model
+        fk_fields = model_with_save_params.fk_fields
+
+        # Exclude pydantic fields for db model
+        exclude_fields_for_db_model = set(fk_fields.values())
+        items_fk_values = [
+            item.meta.model_dump(include=exclude_fields_for_db_model) for item in items
+        ]
+        related_model_ids = self.get_existing_related_ids(
+            db_model, fk_fields, items_fk_values
+        )
+
+        db_entities_to_create = []
+        for item, fk_values in zip(items, items_fk_values):
+            meta = item.meta
+            data = self.prepare_entity_for_save(
+                meta, exclude_fields=exclude_fields_for_db_model
             )
+            data["user_id"] = item.user_id
+            for fk_field, entity_field in fk_fields.items():
+                fk_value = fk_values[entity_field]
+                if fk_value in related_model_ids[fk_field]:
+                    data[fk_field] = fk_value
+                elif fk_value is not None:
+                    # Store meta item code with unresolved fk codes to adjust them later
+                    meta_items_to_adjust_fk[table].setdefault(
+                        (meta.code, item.user_id), {}
+                    )[entity_field] = fk_value
+            db_entities_to_create.append(db_model(**data))
 
-        # save instances to db
-        LogRecord.objects.bulk_create(
-            log_records_to_create,
-            batch_size=2_000,
-            unique_fields=["guid", "table"],
-            ignore_conflicts=True,
+        if self.upsert:
+            self.bulk_upsert(
+                db_model,
+                db_entities_to_create,
+                unique_fields=self.get_unique_fields(
+                    db_model,
+                    model_with_save_params.unique_fields or [db_model._meta.pk.name],
+                ),
+                modified_field="record_modified",
+            )
+        else:
+            self.bulk_create(db_model, db_entities_to_create)
+
+    @cached_property
+    def partitioned_tables(self) -> set[str]:
+        return get_partitioned_tables()
+
+    def get_unique_fields(
+        self, db_model: Type[Model], unique_fields: list[str]
+    ) -> list[str]:
+        return get_unique_fields(db_model, unique_fields, self.partitioned_tables)
+
+    def bulk_create(
+        self, db_model: Type[Model], db_entities: list[Model], **kwargs: Any
+    ) -> None:
+        """Inserts entities, kwargs are the same as for `QuerySet.bulk_create`."""
+        db_model.objects.bulk_create(db_entities, batch_size=2_000, **kwargs)
+
+    def bulk_upsert(
+        self,
+        db_model: Type[Model],
+        db_entities: list[Model],
+        unique_fields: list[str],
+        modified_field: str,
+    ) -> None:
+        """
+        Inserts new entities and updates existing ones, but only if they were
+        modified after the saved version, so unchanged rows are not touched.
+        Owners of existing rows are never changed.
+        """
+        db_entities = self.exclude_not_modified(
+            db_model, db_entities, unique_fields, modified_field
         )
-        for (
+        update_fields = [
+            field.name
+            for field in db_model._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in unique_fields
+            and field.name != "user_id"
+        ]
+        self.bulk_create(
             db_model,
-            db_entities_to_create,
-        ) in db_model_to_db_entities_to_create.items():
-            db_model.objects.bulk_create(db_entities_to_create, batch_size=2_000)
+            db_entities,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
 
-        self.adjust_relations(meta_items_to_adjust_fk)
+    @staticmethod
+    def exclude_not_modified(
+        db_model: Type[Model],
+        db_entities: list[Model],
+        unique_fields: list[str],
+        modified_field: str,
+    ) -> list[Model]:
+        """
+        Returns entities which don't exist in db or have a newer modification time.
+        Only the latest version of entities duplicated by unique fields is kept.
+        Rows owned by another user are not updated, rows without owner can be.
+        """
+
+        def get_key(db_entity: Model) -> tuple:
+            return tuple(getattr(db_entity, field_name) for field_name in unique_fields)
+
+        key_to_db_entity: dict[tuple, Model] = {}
+        for db_entity in db_entities:
+            key = get_key(db_entity)
+            if key not in key_to_db_entity or getattr(
+                db_entity, modified_field
+            ) >= getattr(key_to_db_entity[key], modified_field):
+                key_to_db_entity[key] = db_entity
+
+        # all unique fields are filtered, so partitions are pruned by the partition key
+        key_to_saved = {
+            tuple(values[:-2]): values[-2:]
+            for values in db_model.objects.filter(
+                **{
+                    f"{field_name}__in": {key[i] for key in key_to_db_entity}
+                    for i, field_name in enumerate(unique_fields)
+                }
+            ).values_list(*unique_fields, modified_field, "user_id")
+        }
+        return [
+            db_entity
+            for key, db_entity in key_to_db_entity.items()
+            if key not in key_to_saved
+            or (
+                getattr(db_entity, modified_field) > key_to_saved[key][0]
+                and key_to_saved[key][1] in (None, db_entity.user_id)
+            )
+        ]
+
+    @classmethod
+    def get_tables_in_save_order(cls) -> list[TableType]:
+        """Tables ordered by `fk_fields` dependencies, related tables go first."""
+        db_model_to_table = {
+            model_with_save_params.db_model: table
+            for table, model_with_save_params in cls.TABLE_TYPE_TO_MODEL.items()
+        }
+        dependencies = {
+            table: {
+                db_model_to_table[
+                    model_with_save_params.db_model._meta.get_field(
+                        fk_field
+                    ).remote_field.model
+                ]
+                for fk_field in model_with_save_params.fk_fields
+            }
+            for table, model_with_save_params in cls.TABLE_TYPE_TO_MODEL.items()
+        }
+        return list(TopologicalSorter(dependencies).static_order())
 
     @staticmethod
     def prepare_entity_for_save(
@@ -175,38 +572,410 @@ class PilotlogDBSaver(Saver[LogRecordEntity]):
             data[new_key] = data.pop(old_key)
         return data
 
-    def adjust_relations(
-        self,
-        meta_items_to_adjust_fk: dict[TableType, dict[str, dict[str, UUID | str]]],
-    ) -> None:
+    def adjust_relations(self, meta_items_to_adjust_fk: PendingRelations) -> None:
+        """
+        Sets FK fields which were not resolved on creation, if related objects
+        exist now. Rows of a chunk are updated by a single query per batch.
+        """
         for table, meta_items in meta_items_to_adjust_fk.items():
             model_with_save_params = self.TABLE_TYPE_TO_MODEL[table]
             db_model = model_with_save_params.db_model
-            entity_field_to_fk_field = {
-                v: k for k, v in model_with_save_params.fk_fields.items()
+            fk_fields = model_with_save_params.fk_fields
+            # rows of partitioned tables are unique per user, so they are updated
+            # by pk and user
+            by_user = PARTITION_KEY in self.get_unique_fields(
+                db_model, [db_model._meta.pk.name]
+            )
+
+            keys_chunks = (
+                chunked(meta_items.keys(), self.chunk_size)
+                if self.chunk_size
+                else [meta_items.keys()]
+            )
+            for keys in keys_chunks:
+                # Fetch ids of related objects referenced by the chunk only
+                related_model_ids = self.get_existing_related_ids(
+                    db_model, fk_fields, [meta_items[key] for key in keys]
+                )
+                rows = []
+                for key in keys:
+                    fk_values = [
+                        (
+                            fk_value
+                            if (fk_value := meta_items[key].get(entity_field))
+                            in related_model_ids[fk_field]
+                            else None
+                        )
+                        for fk_field, entity_field in fk_fields.items()
+                    ]
+                    if any(fk_value is not None for fk_value in fk_values):
+                        rows.append([*key, *fk_values])
+                for rows_batch in chunked(rows, 2_000):
+                    self.update_relations(db_model, fk_fields, rows_batch, by_user)
+
+    @staticmethod
+    def update_relations(
+        db_model: Type[Model],
+        fk_fields: dict[str, str],
+        rows: list[list[Any]],
+        by_user: bool,
+    ) -> None:
+        """
+        Updates FK fields by `UPDATE ... FROM (VALUES ...)`, rows are
+        (pk, user_id, *fk_values). FK values resolved on creation are kept
+        if a row has no value for them.
+        """
+        quote_name = connection.ops.quote_name
+        meta = db_model._meta
+        fields = [
+            meta.pk,
+            meta.get_field(PARTITION_KEY),
+            *(meta.get_field(fk_field) for fk_field in fk_fields),
+        ]
+        pk_column, user_column, *fk_columns = [
+            quote_name(field.column) for field in fields
+        ]
+        # types of the values are set explicitly, NULL values have no type
+        row_sql = ", ".join(f"%s::{field.db_type(connection)}" for field in fields)
+        set_sql = ", ".join(
+            [
+                *(
+                    f"{column} = coalesce(v.{column}, t.{column})"
+                    for column in fk_columns
+                ),
+                f"{quote_name(meta.get_field('updated_at').column)} = %s",
+            ]
+        )
+        where_sql = f"t.{pk_column} = v.{pk_column}"
+        if by_user:
+            where_sql += f" AND t.{user_column} = v.{user_column}"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {quote_name(meta.db_table)} AS t "
+                f"SET {set_sql} "
+                f"FROM (VALUES {', '.join([f'({row_sql})'] * len(rows))}) "
+                f"AS v ({pk_column}, {user_column}, {', '.join(fk_columns)}) "
+                f"WHERE {where_sql}",
+                [
+                    timezone.now(),
+                    *(
+                        field.get_db_prep_value(value, connection)
+                        for row in rows
+                        for field, value in zip(fields, row)
+                    ),
+                ],
+            )
+
+    @staticmethod
+    def get_existing_related_ids(
+        db_model: Type[Model],
+        fk_fields: dict[str, str],
+        items_fk_values: list[dict[str, UUID | str]],
+    ) -> dict[str, set[UUID | str]]:
+        """
+        Returns ids of existing related objects referenced by the items per FK field.
+        FK fields pointing to the same model share a single query.
+        """
+        related_model_to_fk_fields: dict[Type[Model], list[str]] = defaultdict(list)
+        for fk_field in fk_fields:
+            related_model = db_model._meta.get_field(fk_field).remote_field.model
+            related_model_to_fk_fields[related_model].append(fk_field)
+
+        related_model_ids = {}
+        for related_model, model_fk_fields in related_model_to_fk_fields.items():
+            referenced_ids = {
+                fk_values.get(fk_fields[fk_field])
+                for fk_values in items_fk_values
+                for fk_field in model_fk_fields
             }
+            referenced_ids.discard(None)
+            existing_ids = set(
+                related_model.objects.filter(pk__in=referenced_ids).values_list(
+                    "pk", flat=True
+                )
+            )
+            for fk_field in model_fk_fields:
+                related_model_ids[fk_field] = existing_ids
+        return related_model_ids
+
+
+class PilotlogCopySaver(PilotlogDBSaver):
+    """
+    Saver which inserts rows with PostgreSQL `COPY ... FROM STDIN`.
+
+    Rows are copied straight to the model table, or to a temporary staging table
+    followed by `INSERT ... SELECT ... ON CONFLICT` when conflicts are handled.
+    The result is the same as for `PilotlogDBSaver`, but it's much faster
+    for big imports.
+    """
+
+    def bulk_create(
+        self,
+        db_model: Type[Model],
+        db_entities: list[Model],
+        ignore_conflicts: bool = False,
+        update_conflicts: bool = False,
+        unique_fields: list[str] | None = None,
+        update_fields: list[str] | None = None,
+    ) -> None:
+        if not db_entities:
+            return
 
-            # Fetch all entities that will be updated in a single query
-            db_entities = db_model.objects.in_bulk(meta_items.keys())
+        quote_name = connection.ops.quote_name
+        fields = [
+            field
+            for field in db_model._meta.concrete_fields
+            if not isinstance(field, AutoFieldMixin)
+        ]
+        columns = ", ".join(quote_name(field.column) for field in fields)
+        table = quote_name(db_model._meta.db_table)
+        staging_table = quote_name(f"{db_model._meta.db_table}_staging")
+        use_staging_table = ignore_conflicts or update_conflicts
 
-            # Fetch all related objects
-            related_model_ids = defaultdict(tuple)
-            for fk_field in entity_field_to_fk_field.values():
-                related_model_ids[fk_field] = tuple(
-                    db_model._meta.get_field(fk_field)
-                    .remote_field.model.objects.in_bulk()
-                    .keys()
+        with transaction.atomic(), connection.cursor() as cursor:
+            if use_staging_table:
+                # staging table lives until the end of the transaction
+                cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE {staging_table} ON COMMIT DROP "
+                    f"AS SELECT {columns} FROM {table} WITH NO DATA"
                 )
 
-            # set all FK fields
-            for code, fk_values in meta_items.items():
-                for entity_field, fk_value in fk_values.items():
-                    if entity_field in entity_field_to_fk_field:
-                        fk_field = entity_field_to_fk_field[entity_field]
-                        if fk_value in related_model_ids[fk_field]:
-                            setattr(db_entities[code], fk_field, fk_value)
-
-            # Save all entities
-            db_model.objects.bulk_update(
-                db_entities.values(), fields=list(entity_field_to_fk_field.values())
-            )
+            with (
+                connection.wrap_database_errors,
+                cursor.cursor.copy(
+                    f"COPY {staging_table if use_staging_table else table} "
+                    f"({columns}) FROM STDIN"
+                ) as copy,
+            ):
+                for db_entity in db_entities:
+                    # pre_save sets auto_now fields the same way as bulk_create
+                    copy.write_row(
+                        [
+                            field.get_db_prep_save(
+                                field.pre_save(db_entity, add=True), connection
+                            )
+                            for field in fields
+                        ]
+                    )
+
+            if use_staging_table:
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) "
+                    f"SELECT {columns} FROM {staging_table} "
+                    + self.get_on_conflict_sql(
+                        db_model, update_conflicts, unique_fields, update_fields
+                    )
+                )
+
+    @staticmethod
+    def get_on_conflict_sql(
+        db_model: Type[Model],
+        update_conflicts: bool,
+        unique_fields: list[str] | None,
+        update_fields: list[str] | None,
+    ) -> str:
+        def get_columns(field_names: list[str] | None) -> list[str]:
+            return [
+                connection.ops.quote_name(db_model._meta.get_field(field_name).column)
+                for field_name in field_names or []
+            ]
+
+        conflict_target = ", ".join(get_columns(unique_fields))
+        if conflict_target:
+            conflict_target = f"({conflict_target})"
+        if not update_conflicts:
+            return f"ON CONFLICT {conflict_target} DO NOTHING"
+
+        update_columns = ", ".join(
+            f"{column} = EXCLUDED.{column}" for column in get_columns(update_fields)
+        )
+        return f"ON CONFLICT {conflict_target} DO UPDATE SET {update_columns}"
+
+
+SAVERS: dict[str, Type[PilotlogDBSaver]] = {
+    "orm": PilotlogDBSaver,
+    "copy": PilotlogCopySaver,
+}
+
+
+def import_log_records(
+    file: str | bytes | IO[Any],
+    saver: str = "orm",
+    upsert: bool = False,
+    delta: bool = False,
+    progress: ImportProgress | None = None,
+    commit_size: int | None = None,
+    error_report: ErrorReport | None = None,
+) -> ImportStats | None:
+    """
+    Reads, validates and saves log records from JSON file.
+    Returns stats of new, changed and skipped records in delta mode.
+    Invalid log records are skipped and added to `error_report` if it's given.
+
+    All records are saved in a single transaction, unless `commit_size` is set
+    (`IMPORT_COMMIT_SIZE` by default), then see `import_log_records_in_batches`.
+    """
+    if commit_size is None:
+        commit_size = settings.IMPORT_COMMIT_SIZE
+    db_saver = SAVERS[saver](
+        chunk_size=settings.IMPORT_CHUNK_SIZE,
+        # changed records have to be updated in delta mode
+        upsert=upsert or delta,
+        progress=progress,
+    )
+    if commit_size:
+        options = {
+            "saver": saver,
+            "upsert": upsert,
+            "delta": delta,
+            "skip_invalid": error_report is not None,
+        }
+        return import_log_records_in_batches(
+            file, db_saver, delta, commit_size, options, error_report
+        )
+
+    json_log_records = enumerate(JsonStreamFileReader().read(file))
+    stats = None
+    if delta:
+        stats = ImportStats()
+        json_log_records = exclude_unchanged_items(
+            json_log_records, chunk_size=settings.IMPORT_CHUNK_SIZE, stats=stats
+        )
+    db_saver.save(items=validate_log_records(json_log_records, error_report))
+    return stats
+
+
+def import_log_records_in_batches(
+    file: str | bytes | IO[Any],
+    db_saver: PilotlogDBSaver,
+    delta: bool,
+    commit_size: int,
+    options: dict[str, Any],
+    error_report: ErrorReport | None = None,
+) -> ImportStats | None:
+    """
+    Saves each `commit_size` records of the file in a separate transaction with
+    a checkpoint: hash of the file, import `options` and number of saved records.
+    Import of a file with a checkpoint, e.g. a failed one, is resumed after
+    the saved records. References to records of the next batches are stored
+    with the checkpoint by each batch and resolved at the end.
+
+    The checkpoint is locked by each transaction, so concurrent imports of
+    the same file don't save the same batch, the late one fails instead.
+    """
+    file_hash = get_file_hash(file)
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        file_hash=file_hash, options=options
+    )
+    with transaction.atomic():
+        checkpoint = lock_checkpoint(checkpoint)
+        stats = ImportStats(**(checkpoint.stats or {})) if delta else None
+        meta_items_to_adjust_fk = db_saver.get_meta_items_to_adjust_fk(
+            checkpoint.pending_relations.iterator(chunk_size=settings.IMPORT_CHUNK_SIZE)
+        )
+    if db_saver.progress is not None:
+        db_saver.progress.processed = checkpoint.offset
+
+    json_log_records = islice(
+        enumerate(JsonStreamFileReader().read(file)), checkpoint.offset, None
+    )
+    with (
+        create_validation_executor(
+            settings.IMPORT_VALIDATION_WORKERS, initializer=django.setup
+        )
+        if settings.IMPORT_VALIDATION_WORKERS > 1
+        else nullcontext()
+    ) as executor:
+        for batch in chunked(json_log_records, commit_size):
+            items: Iterable[tuple[int, dict[str, Any]]] = batch
+            if stats is not None:
+                items = exclude_unchanged_items(
+                    batch, chunk_size=settings.IMPORT_CHUNK_SIZE, stats=stats
+                )
+            with transaction.atomic():
+                checkpoint = lock_checkpoint(checkpoint)
+                # only relations of records saved by the batch are stored
+                batch_meta_items_to_adjust_fk = db_saver.get_meta_items_to_adjust_fk()
+                db_saver.save_chunks(
+                    validate_log_records(items, error_report, executor),
+                    batch_meta_items_to_adjust_fk,
+                )
+                for table, meta_items in batch_meta_items_to_adjust_fk.items():
+                    meta_items_to_adjust_fk[table].update(meta_items)
+                ImportPendingRelation.objects.bulk_create(
+                    db_saver.dump_pending_relations(
+                        batch_meta_items_to_adjust_fk, checkpoint
+                    ),
+                    batch_size=2_000,
+                    update_conflicts=True,
+                    unique_fields=["checkpoint", "table", "code", "user_id"],
+                    update_fields=["fk_values"],
+                )
+                checkpoint.offset += len(batch)
+                checkpoint.stats = stats and stats.model_dump()
+                checkpoint.save(update_fields=["offset", "stats", "updated_at"])
+
+    with transaction.atomic():
+        lock_checkpoint(checkpoint)
+        db_saver.adjust_relations(meta_items_to_adjust_fk)
+        checkpoint.delete()
+    return stats
+
+
+def lock_checkpoint(checkpoint: ImportCheckpoint) -> ImportCheckpoint:
+    """
+    Locks the checkpoint until the end of the transaction. It fails if another
+    import has moved or finished it since it was read.
+    """
+    locked_checkpoint = (
+        ImportCheckpoint.objects.select_for_update().filter(pk=checkpoint.pk).first()
+    )
+    if locked_checkpoint is None or locked_checkpoint.offset != checkpoint.offset:
+        raise ImportInProgressError(
+            f"File {checkpoint.file_hash} is imported by another import"
+        )
+    return locked_checkpoint
+
+
+def validate_log_records(
+    indexed_items: Iterable[tuple[int, dict[str, Any]]],
+    error_report: ErrorReport | None = None,
+    executor: ProcessPoolExecutor | None = None,
+) -> Iterator[LogRecordEntity]:
+    """Validates raw log records, errors are reported with their indexes in the file."""
+    json_validator = PilotlogJsonValidator()
+    # indexes and items are consumed together, so the copies don't pile up
+    indexed_items, indexed_items_copy = tee(indexed_items)
+    items = (item for _, item in indexed_items)
+    indexes = (index for index, _ in indexed_items_copy)
+    if settings.IMPORT_VALIDATION_WORKERS > 1:
+        return validate_items_in_parallel(
+            items=items,
+            json_validator=json_validator,
+            workers=settings.IMPORT_VALIDATION_WORKERS,
+            initializer=django.setup,
+            executor=executor,
+            error_report=error_report,
+            indexes=indexes,
+        )
+    return validate_items(
+        items=items,
+        json_validator=json_validator,
+        error_report=error_report,
+        indexes=indexes,
+    )
+
+
+def get_file_hash(file: str | bytes | IO[Any], chunk_size: int = 1024**2) -> str:
+    """SHA-256 of the file content, file is read from the start and rewound."""
+    file_hash = hashlib.sha256()
+    if isinstance(file, (str, bytes)):
+        file_hash.update(file.encode() if isinstance(file, str) else file)
+        return file_hash.hexdigest()
+
+    file.seek(0)
+    while chunk := file.read(chunk_size):
+        file_hash.update(chunk.encode() if isinstance(chunk, str) else chunk)
+    file.seek(0)
+    return file_hash.hexdigest()
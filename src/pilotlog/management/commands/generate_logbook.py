@@ -0,0 +1,63 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from pilotlog.importer.generator import LogbookGenerator, write_log_records
+
+
+class Command(BaseCommand):
+    help = "Generates JSON import file of synthetic logbooks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output", help="Path of the file, the file is written to stdout if -"
+        )
+        parser.add_argument("--users", type=int, default=1, help="Number of logbooks")
+        parser.add_argument(
+            "--flights", type=int, default=1_000, help="Number of flights per logbook"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="The same seed generates the same file"
+        )
+        parser.add_argument(
+            "--dangling-ratio",
+            type=float,
+            default=0.01,
+            help="Ratio of references to records which don't exist",
+        )
+        parser.add_argument(
+            "--duplicate-ratio",
+            type=float,
+            default=0.0,
+            help="Ratio of repeated records, they can be imported with upsert only",
+        )
+        parser.add_argument(
+            "--revision",
+            type=int,
+            default=0,
+            help="Revision of the logbooks with some records modified, to re-import",
+        )
+        parser.add_argument(
+            "--changed-ratio",
+            type=float,
+            default=0.1,
+            help="Ratio of records modified in each revision",
+        )
+
+    def handle(self, *args, **options):
+        generator = LogbookGenerator(
+            users=options["users"],
+            flights=options["flights"],
+            seed=options["seed"],
+            dangling_ratio=options["dangling_ratio"],
+            duplicate_ratio=options["duplicate_ratio"],
+            revision=options["revision"],
+            changed_ratio=options["changed_ratio"],
+        )
+        if options["output"] == "-":
+            write_log_records(generator.generate(), sys.stdout)
+            return
+
+        with open(options["output"], "w", buffering=1024**2) as file:
+            count = write_log_records(generator.generate(), file)
+        self.stdout.write(f"Generated {count} log records to {options['output']}")
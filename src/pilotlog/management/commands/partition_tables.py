@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pilotlog.partitioning import partition_tables
+
+
+class Command(BaseCommand):
+    help = "Partitions the biggest tables by hash of user"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=settings.DB_PARTITIONS or 16,
+            help="Number of partitions of each table",
+        )
+
+    def handle(self, *args, **options):
+        tables = partition_tables(options["partitions"])
+        if not tables:
+            self.stdout.write("Tables are already partitioned")
+        for table in tables:
+            self.stdout.write(f"Partitioned {table} into {options['partitions']}")
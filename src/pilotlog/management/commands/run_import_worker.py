@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pilotlog.importer.jobs import claim_next_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = "Runs pending background import jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when there are no pending jobs",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait for new jobs",
+        )
+        parser.add_argument(
+            "--progress-interval",
+            type=float,
+            default=1.0,
+            help="Seconds between job progress updates",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Running import job {job.pk}")
+            run_import_job(job, progress_interval=options["progress_interval"])
+            self.stdout.write(f"Import job {job.pk} {job.status}")
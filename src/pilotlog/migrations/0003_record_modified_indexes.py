@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0002_import_job"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="aircraft",
+            index=models.Index(
+                fields=["record_modified"], name="pilotlog_ai_record__718d3e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["record_modified"], name="pilotlog_fl_record__5193f2_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0003_record_modified_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="logrecord",
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name="logrecord",
+            index=models.Index(
+                fields=["user_id", "table"], name="pilotlog_logrecord_user_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="logrecord",
+            constraint=models.UniqueConstraint(
+                fields=("guid", "table"),
+                include=("modified",),
+                name="pilotlog_logrecord_guid_table_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:52
+
+from django.db import migrations, models
+
+
+TABLE_TO_MODEL = {
+    "aircraft": "Aircraft",
+    "airfield": "AirField",
+    "flight": "Flight",
+    "imagepic": "ImagePic",
+    "limitrules": "LimitRules",
+    "myquery": "MyQuery",
+    "myquerybuild": "MyQueryBuild",
+    "pilot": "Pilot",
+    "qualification": "Qualification",
+    "settingconfig": "SettingConfig",
+}
+
+
+def set_user_id_from_log_records(apps, schema_editor):
+    quote_name = schema_editor.quote_name
+    log_record_table = apps.get_model("pilotlog", "LogRecord")._meta.db_table
+    for table, model_name in TABLE_TO_MODEL.items():
+        model = apps.get_model("pilotlog", model_name)
+        pk_column = quote_name(model._meta.pk.column)
+        schema_editor.execute(
+            f"UPDATE {quote_name(model._meta.db_table)} AS m "
+            f"SET user_id = l.user_id FROM {quote_name(log_record_table)} AS l "
+            f'WHERE l."table" = %s AND lower(l.guid) = m.{pk_column}::text',
+            [table],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0004_log_record_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="aircraft",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="airfield",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="flight",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="imagepic",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="limitrules",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="myquery",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="myquerybuild",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="pilot",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="qualification",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="settingconfig",
+            name="user_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(set_user_id_from_log_records, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="aircraft",
+            index=models.Index(
+                fields=["user_id", "record_modified"],
+                name="pilotlog_ai_user_id_c14e09_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="airfield",
+            index=models.Index(
+                fields=["user_id", "record_modified"],
+                name="pilotlog_ai_user_id_c642b4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["user_id", "record_modified"],
+                name="pilotlog_fl_user_id_6a1a5f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pilot",
+            index=models.Index(
+                fields=["user_id", "record_modified"],
+                name="pilotlog_pi_user_id_9eb56f_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Tables used to be partitioned here if `DB_PARTITIONS` was set. Partitioning
+    depends on the environment, so it's done by `partition_tables` command now,
+    the migration is kept for migrations depending on it.
+    """
+
+    dependencies = [
+        ("pilotlog", "0005_user_ownership"),
+    ]
+
+    operations = []
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0006_partitioning"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("file_hash", models.CharField(max_length=64, unique=True)),
+                ("offset", models.PositiveBigIntegerField(default=0)),
+                ("pending_relations", models.JSONField(default=dict)),
+                ("stats", models.JSONField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
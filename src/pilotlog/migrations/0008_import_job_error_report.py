@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0007_import_checkpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="error_report",
+            field=models.FileField(blank=True, upload_to="import_errors/"),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="invalid",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
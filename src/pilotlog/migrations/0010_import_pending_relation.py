@@ -0,0 +1,77 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import pilotlog.importer.entities
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0009_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportPendingRelation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "table",
+                    models.CharField(
+                        choices=pilotlog.importer.entities.TableType.choices,
+                        max_length=25,
+                    ),
+                ),
+                ("code", models.CharField(max_length=36)),
+                ("user_id", models.PositiveIntegerField()),
+                ("fk_values", models.JSONField()),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name="importcheckpoint",
+            name="pending_relations",
+        ),
+        migrations.AddField(
+            model_name="importcheckpoint",
+            name="options",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AlterField(
+            model_name="importcheckpoint",
+            name="file_hash",
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name="importcheckpoint",
+            constraint=models.UniqueConstraint(
+                fields=("file_hash", "options"),
+                name="pilotlog_importcheckpoint_file_hash_options_uniq",
+            ),
+        ),
+        migrations.AddField(
+            model_name="importpendingrelation",
+            name="checkpoint",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="pending_relations",
+                to="pilotlog.importcheckpoint",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="importpendingrelation",
+            constraint=models.UniqueConstraint(
+                fields=("checkpoint", "table", "code", "user_id"),
+                name="pilotlog_importpendingrelation_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0010_import_pending_relation"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="logrecord",
+            name="pilotlog_logrecord_guid_table_uniq",
+        ),
+        migrations.AddConstraint(
+            model_name="logrecord",
+            constraint=models.UniqueConstraint(
+                fields=("guid", "table", "user_id"),
+                include=("modified",),
+                name="pilotlog_logrecord_guid_table_user_uniq",
+            ),
+        ),
+        # primary key is replaced, existing rows get ids on adding the column
+        migrations.AlterField(
+            model_name="settingconfig",
+            name="code",
+            field=models.IntegerField(),
+        ),
+        migrations.AddField(
+            model_name="settingconfig",
+            name="id",
+            field=models.BigAutoField(
+                auto_created=True,
+                primary_key=True,
+                serialize=False,
+                verbose_name="ID",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="settingconfig",
+            constraint=models.UniqueConstraint(
+                fields=("code", "user_id"), name="pilotlog_settingconfig_code_user_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0011_per_user_uniqueness"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="aircraft",
+            index=models.Index(
+                fields=["updated_at"], name="pilotlog_ai_updated_08c3ab_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="aircraft",
+            index=models.Index(
+                fields=["user_id", "updated_at"], name="pilotlog_ai_user_id_41d828_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="airfield",
+            index=models.Index(
+                fields=["updated_at"], name="pilotlog_ai_updated_e95a22_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="airfield",
+            index=models.Index(
+                fields=["user_id", "updated_at"], name="pilotlog_ai_user_id_a7a1b6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["updated_at"], name="pilotlog_fl_updated_8217f6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["user_id", "updated_at"], name="pilotlog_fl_user_id_2d9930_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pilot",
+            index=models.Index(
+                fields=["updated_at"], name="pilotlog_pi_updated_356fa2_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pilot",
+            index=models.Index(
+                fields=["user_id", "updated_at"], name="pilotlog_pi_user_id_e80f5a_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pilotlog", "0012_updated_at_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
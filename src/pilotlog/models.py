@@ -1,3 +1,6 @@
+import uuid
+from datetime import datetime
+
 from django.db import models
 from django.db.models import QuerySet
 from django.db.models.functions import Cast, Coalesce, Concat
@@ -13,7 +16,19 @@ class LogRecord(models.Model):
     modified = models.DateTimeField()
 
     class Meta:
-        unique_together = (("guid", "table"),)
+        constraints = [
+            # modified is included for index-only lookup of changed records
+            models.UniqueConstraint(
+                fields=["guid", "table", "user_id"],
+                include=["modified"],
+                name="pilotlog_logrecord_guid_table_user_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user_id", "table"], name="pilotlog_logrecord_user_idx"
+            ),
+        ]
 
 
 class CodeMixin(models.Model):
@@ -24,14 +39,32 @@ class CodeMixin(models.Model):
 
 
 class RecordModifiedMixin(models.Model):
+    # modification time of the record on the device it was edited on
     record_modified = models.DateTimeField()
+    # time the record was last written by the server, e.g. created or updated by import
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class UserMixin(models.Model):
+    # owner of the record, the same as of its log record,
+    # it's not set for records imported before it was added
+    user_id = models.PositiveIntegerField(null=True)
 
     class Meta:
         abstract = True
 
 
 class AircraftManager(models.Manager):
-    def data_for_export(self) -> QuerySet["Aircraft"]:
+    def data_for_export(
+        self, since: datetime | None = None, user_id: int | None = None
+    ) -> QuerySet["Aircraft"]:
+        """
+        Rows to export, only modified at or after `since` and owned by `user_id`
+        if they are set.
+        """
         empty_value = models.Value("", output_field=models.CharField())
 
         # if field is commented, it means it exist in requirements template,
@@ -56,14 +89,17 @@ class AircraftManager(models.Manager):
             # "Pressurized": empty_value,
             # "TAA": empty_value,
         }
-        return (
-            self.get_queryset()
-            .annotate(**export_annotations)
-            .values(*export_annotations.keys())
+        queryset = self.get_queryset()
+        if since is not None:
+            queryset = queryset.filter(record_modified__gte=since)
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        return queryset.annotate(**export_annotations).values(
+            *export_annotations.keys()
         )
 
 
-class Aircraft(CodeMixin, RecordModifiedMixin):
+class Aircraft(CodeMixin, RecordModifiedMixin, UserMixin):
     fin = models.CharField(max_length=255)
     sea = models.BooleanField()
     tmg = models.BooleanField()
@@ -101,8 +137,17 @@ class Aircraft(CodeMixin, RecordModifiedMixin):
 
     objects = AircraftManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["record_modified"]),
+            models.Index(fields=["user_id", "record_modified"]),
+            # exports are cached until the latest update time changes
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["user_id", "updated_at"]),
+        ]
 
-class AirField(CodeMixin, RecordModifiedMixin):
+
+class AirField(CodeMixin, RecordModifiedMixin, UserMixin):
     af_cat = models.PositiveIntegerField()
     afiata = models.CharField(max_length=255)
     aficao = models.CharField(max_length=255)
@@ -122,8 +167,15 @@ class AirField(CodeMixin, RecordModifiedMixin):
     city = models.CharField(max_length=255, blank=True, null=True)
     notes = models.CharField(max_length=255, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_id", "record_modified"]),
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["user_id", "updated_at"]),
+        ]
 
-class Pilot(CodeMixin, RecordModifiedMixin):
+
+class Pilot(CodeMixin, RecordModifiedMixin, UserMixin):
     notes = models.CharField(max_length=255)
     active = models.BooleanField()
     company = models.CharField(max_length=255)
@@ -140,9 +192,22 @@ class Pilot(CodeMixin, RecordModifiedMixin):
     pilot_search = models.CharField(max_length=255)
     roster_alias = models.CharField(max_length=255, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_id", "record_modified"]),
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["user_id", "updated_at"]),
+        ]
+
 
 class FlightManager(models.Manager):
-    def data_for_export(self) -> QuerySet["Flight"]:
+    def data_for_export(
+        self, since: datetime | None = None, user_id: int | None = None
+    ) -> QuerySet["Flight"]:
+        """
+        Rows to export, only modified at or after `since` and owned by `user_id`
+        if they are set.
+        """
         empty_value = models.Value("", output_field=models.CharField())
 
         def _get_pilot_data(p: str):
@@ -232,15 +297,19 @@ class FlightManager(models.Manager):
             # "[Toggle]CustomFieldName": empty_value,
             # "PilotComments": empty_value,
         }
+        queryset = self.get_queryset()
+        if since is not None:
+            queryset = queryset.filter(record_modified__gte=since)
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
         return (
-            self.get_queryset()
-            .select_related("p1", "p2", "p3", "p4", "dep")
+            queryset.select_related("p1", "p2", "p3", "p4", "dep")
             .annotate(**export_annotations)
             .values(*export_annotations.keys())
         )
 
 
-class Flight(CodeMixin, RecordModifiedMixin):
+class Flight(CodeMixin, RecordModifiedMixin, UserMixin):
     pf = models.BooleanField()
     pax = models.PositiveIntegerField()
     fuel = models.PositiveIntegerField()
@@ -361,8 +430,17 @@ class Flight(CodeMixin, RecordModifiedMixin):
 
     objects = FlightManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["record_modified"]),
+            models.Index(fields=["user_id", "record_modified"]),
+            # exports are cached until the latest update time changes
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["user_id", "updated_at"]),
+        ]
+
 
-class ImagePic(CodeMixin, RecordModifiedMixin):
+class ImagePic(CodeMixin, RecordModifiedMixin, UserMixin):
     file_ext = models.CharField(max_length=10)
     file_name = models.CharField(max_length=255)
     link_code = models.UUIDField()
@@ -370,7 +448,7 @@ class ImagePic(CodeMixin, RecordModifiedMixin):
     img_download = models.BooleanField()
 
 
-class LimitRules(CodeMixin, RecordModifiedMixin):
+class LimitRules(CodeMixin, RecordModifiedMixin, UserMixin):
     l_to = models.DateField()
     l_from = models.DateField()
     l_type = models.PositiveIntegerField()
@@ -379,13 +457,13 @@ class LimitRules(CodeMixin, RecordModifiedMixin):
     l_period_code = models.PositiveIntegerField()
 
 
-class MyQuery(CodeMixin, RecordModifiedMixin):
+class MyQuery(CodeMixin, RecordModifiedMixin, UserMixin):
     name = models.CharField(max_length=255)
     quick_view = models.BooleanField()
     short_name = models.CharField(max_length=255)
 
 
-class MyQueryBuild(CodeMixin, RecordModifiedMixin):
+class MyQueryBuild(CodeMixin, RecordModifiedMixin, UserMixin):
     my_query = models.ForeignKey(
         MyQuery, on_delete=models.SET_NULL, null=True, related_name="builds"
     )
@@ -396,7 +474,7 @@ class MyQueryBuild(CodeMixin, RecordModifiedMixin):
     build_4 = models.CharField(max_length=255)
 
 
-class Qualification(CodeMixin, RecordModifiedMixin):
+class Qualification(CodeMixin, RecordModifiedMixin, UserMixin):
     ref_extra = models.IntegerField()
     ref_model = models.CharField(max_length=255)
     validity = models.IntegerField()
@@ -413,9 +491,97 @@ class Qualification(CodeMixin, RecordModifiedMixin):
     )
 
 
-class SettingConfig(RecordModifiedMixin):
-    code = models.IntegerField(primary_key=True)
+class SettingConfig(RecordModifiedMixin, UserMixin):
+    # setting codes are small numbers of a device, the same for all users
+    code = models.IntegerField()
 
     data = models.CharField(max_length=255)
     name = models.CharField(max_length=255)
     group = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["code", "user_id"], name="pilotlog_settingconfig_code_user_uniq"
+            ),
+        ]
+
+
+class ImportJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(upload_to="imports/")
+    # import parameters, see `pilotlog.importer.services.import_log_records`
+    params = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+
+    processed = models.PositiveIntegerField(default=0)
+    table_counts = models.JSONField(default=dict)
+    stats = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    # skipped invalid log records and JSON lines report of their errors
+    invalid = models.PositiveIntegerField(default=0)
+    error_report = models.FileField(upload_to="import_errors/", blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # updated by the worker while the job is running, see `claim_next_job`
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Last committed batch of an import in batches, the import of the same file
+    with the same options is resumed from it, see
+    `pilotlog.importer.services.import_log_records`.
+    """
+
+    file_hash = models.CharField(max_length=64)
+    # import options which change saved records, e.g. upsert
+    options = models.JSONField(default=dict)
+    # number of file records which are saved
+    offset = models.PositiveBigIntegerField(default=0)
+    # delta import stats of saved records
+    stats = models.JSONField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["file_hash", "options"],
+                name="pilotlog_importcheckpoint_file_hash_options_uniq",
+            ),
+        ]
+
+
+class ImportPendingRelation(models.Model):
+    """
+    FK values of a record saved by an import in batches, which reference records
+    not saved yet. They are stored per record, so each batch inserts only its own.
+    """
+
+    checkpoint = models.ForeignKey(
+        ImportCheckpoint, on_delete=models.CASCADE, related_name="pending_relations"
+    )
+    table = models.CharField(max_length=25, choices=TableType.choices)
+    code = models.CharField(max_length=36)
+    user_id = models.PositiveIntegerField()
+    # {entity_fk_field_name: value}
+    fk_values = models.JSONField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["checkpoint", "table", "code", "user_id"],
+                name="pilotlog_importpendingrelation_uniq",
+            ),
+        ]
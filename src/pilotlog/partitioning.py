@@ -0,0 +1,181 @@
+"""
+Declarative PostgreSQL partitioning of the biggest tables by hash of `user_id`,
+so vacuum and index maintenance work on small partitions and queries of a user
+are pruned to a single partition.
+
+A partitioned table can't have a unique index without the partition key, so
+`user_id` is added to all unique indexes and constraints, including the primary
+key, and conflicts on import are resolved by them (see `get_unique_fields`).
+"""
+
+import re
+from typing import Type
+
+from django.db import connection, transaction
+from django.db.models import Model
+from django.db.utils import NotSupportedError
+
+from pilotlog.models import Flight, LogRecord
+
+
+PARTITION_KEY = "user_id"
+PARTITIONED_MODELS: list[Type[Model]] = [LogRecord, Flight]
+
+
+def partition_tables(partitions: int) -> list[str]:
+    """Partitions tables of `PARTITIONED_MODELS`, returns newly partitioned ones."""
+    partitioned_tables = get_partitioned_tables()
+    tables = [
+        db_model._meta.db_table
+        for db_model in PARTITIONED_MODELS
+        if db_model._meta.db_table not in partitioned_tables
+    ]
+    with transaction.atomic():
+        for table in tables:
+            partition_table(table, partitions)
+    return tables
+
+
+def partition_table(table: str, partitions: int, key: str = PARTITION_KEY) -> None:
+    """
+    Replaces the table with a table partitioned by hash of `key` into
+    `partitions` partitions, keeping rows, defaults, indexes and constraints.
+    The table is rewritten, so it's locked until the end of the transaction.
+    """
+    quote_name = connection.ops.quote_name
+    old_table = f"{table}_unpartitioned"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # deferred foreign key checks of the transaction block altering the table
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            "SELECT count(*) FROM pg_constraint WHERE confrelid = %s::regclass",
+            [table],
+        )
+        if cursor.fetchone()[0]:
+            raise NotSupportedError(f"{table} is referenced by foreign keys")
+
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        constraint_names = {name for name, _, _ in constraints}
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s",
+            [table],
+        )
+        indexes = [
+            (name, definition)
+            for name, definition in cursor.fetchall()
+            if name not in constraint_names
+        ]
+        cursor.execute(
+            "SELECT attname FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attidentity != ''",
+            [table],
+        )
+        identity_columns = [column for (column,) in cursor.fetchall()]
+        cursor.execute(
+            "SELECT attnotnull FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attname = %s",
+            [table, key],
+        )
+        key_not_null = cursor.fetchone()[0]
+        has_primary_key = any(contype == "p" for _, contype, _ in constraints)
+        if has_primary_key and not key_not_null and connection.pg_version < 150000:
+            raise NotSupportedError(
+                f"{table} with nullable {key} can be partitioned "
+                f"on PostgreSQL 15 or later only"
+            )
+
+        # names of constraints and indexes are released for the new table
+        cursor.execute(
+            f"ALTER TABLE {quote_name(table)} RENAME TO {quote_name(old_table)}"
+        )
+        for name, _, _ in constraints:
+            cursor.execute(
+                f"ALTER TABLE {quote_name(old_table)} "
+                f"DROP CONSTRAINT {quote_name(name)}"
+            )
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {quote_name(name)}")
+
+        cursor.execute(
+            f"CREATE TABLE {quote_name(table)} "
+            f"(LIKE {quote_name(old_table)} INCLUDING DEFAULTS INCLUDING IDENTITY) "
+            f"PARTITION BY HASH ({quote_name(key)})"
+        )
+        for remainder in range(partitions):
+            cursor.execute(
+                f"CREATE TABLE {quote_name(f'{table}_p{remainder}')} "
+                f"PARTITION OF {quote_name(table)} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            )
+        cursor.execute(
+            f"INSERT INTO {quote_name(table)} SELECT * FROM {quote_name(old_table)}"
+        )
+        for column in identity_columns:
+            # identity sequence of the new table starts from 1
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, %s), "
+                f"coalesce(max({quote_name(column)}), 0) + 1, false) "
+                f"FROM {quote_name(table)}",
+                [table, column],
+            )
+        cursor.execute(f"DROP TABLE {quote_name(old_table)}")
+
+        for name, contype, definition in constraints:
+            if contype != "f":
+                definition = add_key_to_columns(definition, key)
+                # primary key columns must be not null, rows without the key
+                # are still unique by the rest of the primary key (PostgreSQL 15+)
+                if contype == "p" and not key_not_null:
+                    definition = definition.replace(
+                        "PRIMARY KEY", "UNIQUE NULLS NOT DISTINCT", 1
+                    )
+            cursor.execute(
+                f"ALTER TABLE {quote_name(table)} "
+                f"ADD CONSTRAINT {quote_name(name)} {definition}"
+            )
+        for name, definition in indexes:
+            if definition.startswith("CREATE UNIQUE INDEX"):
+                definition = add_key_to_columns(definition, key)
+            cursor.execute(definition)
+
+
+def add_key_to_columns(definition: str, key: str) -> str:
+    """Adds `key` to the first column list of index or constraint definition."""
+    return re.sub(
+        r"\(([^)]*)\)",
+        lambda match: (
+            match[0]
+            if {key, f'"{key}"'} & set(match[1].split(", "))
+            else f"({match[1]}, {key})"
+        ),
+        definition,
+        count=1,
+    )
+
+
+def get_partitioned_tables() -> set[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relnamespace = current_schema()::regnamespace"
+        )
+        return {table for (table,) in cursor.fetchall()}
+
+
+def get_unique_fields(
+    db_model: Type[Model], unique_fields: list[str], partitioned_tables: set[str]
+) -> list[str]:
+    """Fields of a unique index, which has the partition key if table is partitioned."""
+    if db_model._meta.db_table in partitioned_tables and PARTITION_KEY not in (
+        unique_fields
+    ):
+        return [*unique_fields, PARTITION_KEY]
+    return unique_fields
@@ -1,8 +1,15 @@
+import types
+import uuid
+from datetime import date, datetime
+from typing import Any
+
 from django.utils import timezone
 from factory import fuzzy
 from factory.django import DjangoModelFactory
 
 from pilotlog import models
+from pilotlog.importer.entities import TableType
+from pilotlog.importer.services import PilotlogJsonValidator
 
 
 class LogRecordFactory(DjangoModelFactory):
@@ -12,3 +19,46 @@ class LogRecordFactory(DjangoModelFactory):
 
     class Meta:
         model = models.LogRecord
+
+
+DEFAULT_META_VALUES = {
+    str: "",
+    int: 0,
+    float: 0.0,
+    bool: False,
+    date: "2024-01-01",
+    datetime: 1716000000,
+}
+
+
+def build_meta_data(table: TableType, **fields: Any) -> dict[str, Any]:
+    """Raw `meta` of a log record as it is in the import file, keys are aliases."""
+    entity = PilotlogJsonValidator.TABLE_TYPE_TO_ENTITY[table]
+    data = {}
+    for field in entity.model_fields.values():
+        if isinstance(field.annotation, types.UnionType):
+            data[field.alias] = None
+        elif field.annotation is uuid.UUID:
+            data[field.alias] = str(uuid.uuid4())
+        else:
+            data[field.alias] = DEFAULT_META_VALUES[field.annotation]
+    return {**data, **fields}
+
+
+def build_log_record_data(
+    table: TableType, meta: dict[str, Any] | None = None, **fields: Any
+) -> dict[str, Any]:
+    """Raw log record as it is in the import file."""
+    meta = build_meta_data(table, **(meta or {}))
+    code_alias = (
+        PilotlogJsonValidator.TABLE_TYPE_TO_ENTITY[table].model_fields["code"].alias
+    )
+    return {
+        "user_id": 1,
+        "guid": str(meta[code_alias]),
+        "table": table.value.capitalize(),
+        "meta": meta,
+        "platform": 9,
+        "_modified": 1716000000,
+        **fields,
+    }
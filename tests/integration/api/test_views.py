@@ -0,0 +1,322 @@
+import gzip
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from pilotlog.importer.entities import TableType
+from pilotlog.models import Flight, ImportJob, LogRecord, Pilot
+from tests.factories import build_log_record_data
+
+
+pytestmark = pytest.mark.django_db  # noqa
+
+
+@pytest.fixture
+def client() -> APIClient:
+    return APIClient()
+
+
+def get_import_file(items: list[dict]) -> SimpleUploadedFile:
+    return SimpleUploadedFile("import.json", json.dumps(items).encode())
+
+
+class TestImportView:
+    @pytest.fixture
+    def items(self) -> list[dict]:
+        return [
+            build_log_record_data(TableType.FLIGHT),
+            build_log_record_data(TableType.PILOT),
+        ]
+
+    def test_import(self, client: APIClient, items: list[dict]) -> None:
+        response = client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+
+        assert response.status_code == 201, response.data
+        assert LogRecord.objects.count() == 2
+        assert Flight.objects.count() == 1
+        assert Pilot.objects.count() == 1
+
+    def test_import_invalid_file_type(self, client: APIClient) -> None:
+        file = SimpleUploadedFile("import.csv", b"[]")
+
+        response = client.post(reverse("import"), {"file": file}, format="multipart")
+
+        assert response.status_code == 400
+
+    def test_import_delta(self, client: APIClient, items: list[dict]) -> None:
+        client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+        items[0]["_modified"] += 1
+        items[0]["meta"]["Record_Modified"] += 1
+        items[0]["meta"]["Route"] = "new route"
+
+        response = client.post(
+            reverse("import"),
+            {"file": get_import_file(items), "delta": True, "saver": "copy"},
+            format="multipart",
+        )
+
+        assert response.status_code == 201, response.data
+        assert response.data["stats"] == {"new": 0, "changed": 1, "skipped": 1}
+        assert Flight.objects.get().route == "new route"
+
+    def test_import_skip_invalid(self, client: APIClient, items: list[dict]) -> None:
+        items[0]["meta"]["Route"] = None
+
+        response = client.post(
+            reverse("import"),
+            {"file": get_import_file(items), "skip_invalid": True},
+            format="multipart",
+        )
+
+        assert response.status_code == 201, response.data
+        assert len(response.data["errors"]) == 1
+        error = response.data["errors"][0]
+        assert error["index"] == 0
+        assert error["guid"] == items[0]["guid"]
+        assert error["table"] == "Flight"
+        assert list(error["errors"][0]["loc"]) == ["flight", "meta", "Route"]
+        assert LogRecord.objects.count() == 1
+        assert Pilot.objects.count() == 1
+
+
+class TestImportJobViews:
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path) -> None:
+        settings.MEDIA_ROOT = tmp_path
+
+    def test_create_and_retrieve(self, client: APIClient) -> None:
+        items = [build_log_record_data(TableType.PILOT)]
+
+        response = client.post(
+            reverse("import-jobs"),
+            {"file": get_import_file(items), "upsert": True},
+            format="multipart",
+        )
+
+        assert response.status_code == 201, response.data
+        job = ImportJob.objects.get(pk=response.data["id"])
+        assert job.params == {
+            "saver": "orm",
+            "upsert": True,
+            "delta": False,
+            "skip_invalid": False,
+        }
+
+        response = client.get(reverse("import-job-detail", args=[job.pk]))
+
+        assert response.status_code == 200
+        assert response.data["status"] == ImportJob.Status.PENDING
+        assert response.data["processed"] == 0
+        assert response.data["throughput"] is None
+
+
+class TestExportView:
+    @pytest.fixture(autouse=True)
+    def export_cache_dir(self, settings, tmp_path) -> None:
+        settings.EXPORT_CACHE_DIR = tmp_path
+
+    def test_export(self, client: APIClient) -> None:
+        items = [
+            build_log_record_data(TableType.AIRCRAFT, meta={"Make": "Cessna"}),
+            build_log_record_data(TableType.FLIGHT, meta={"Route": "KJFK-KBOS"}),
+        ]
+        client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("export"))
+            # only export key is calculated before streaming
+            assert all("MAX(" in query["sql"] for query in queries)
+
+            content = b"".join(response.streaming_content).decode()
+
+        assert response["Content-Type"] == "text/csv"
+        assert "Content-Encoding" not in response
+        assert "Cessna" in content
+        assert "KJFK-KBOS" in content
+
+    def test_export_accept_encoding(self, client: APIClient) -> None:
+        content = b"".join(client.get(reverse("export")).streaming_content)
+
+        response = client.get(reverse("export"), HTTP_ACCEPT_ENCODING="gzip")
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert gzip.decompress(b"".join(response.streaming_content)) == content
+
+    def test_export_unbuffered(self, client: APIClient, settings) -> None:
+        content = b"".join(client.get(reverse("export")).streaming_content)
+        settings.EXPORT_BUFFER_SIZE = 0
+
+        # lines of unbuffered export are compressed and cached as bytes
+        for _ in range(2):
+            response = client.get(reverse("export"), HTTP_ACCEPT_ENCODING="gzip")
+
+            assert gzip.decompress(b"".join(response.streaming_content)) == content
+
+    def test_export_compressed_file(self, client: APIClient) -> None:
+        response = client.get(reverse("export"), {"compression": "gzip"})
+
+        assert response["Content-Type"] == "application/gzip"
+        assert "Content-Encoding" not in response
+        assert 'filename="export.csv.gz"' in response["Content-Disposition"]
+        assert gzip.decompress(b"".join(response.streaming_content))
+
+    @pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+    def test_export_columnar(self, client: APIClient, export_format: str) -> None:
+        pyarrow = pytest.importorskip("pyarrow")
+        items = [build_log_record_data(TableType.AIRCRAFT, meta={"Make": "Cessna"})]
+        client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+
+        response = client.get(
+            reverse("export"), {"format": export_format, "table": "aircraft"}
+        )
+
+        assert response.status_code == 200
+        data = b"".join(response.streaming_content)
+        if export_format == "parquet":
+            table = pyarrow.parquet.read_table(pyarrow.BufferReader(data))
+        else:
+            table = pyarrow.ipc.open_stream(data).read_all()
+        assert table.column("Make").to_pylist() == ["Cessna"]
+
+    def test_export_cached(self, client: APIClient) -> None:
+        items = [build_log_record_data(TableType.AIRCRAFT)]
+        client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+        response = client.get(reverse("export"))
+        content = b"".join(response.streaming_content)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached_response = client.get(reverse("export"))
+            cached_content = b"".join(cached_response.streaming_content)
+            assert all("MAX(" in query["sql"] for query in queries)
+
+        assert cached_content == content
+        assert cached_response["ETag"] == response["ETag"]
+
+        response = client.get(reverse("export"), HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert response.status_code == 304
+
+        items[0]["meta"]["Record_Modified"] += 1
+        items[0]["meta"]["Make"] = "Cessna"
+        client.post(
+            reverse("import"),
+            {"file": get_import_file(items), "upsert": True},
+            format="multipart",
+        )
+        response = client.get(reverse("export"), HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert response.status_code == 200
+        assert b"Cessna" in b"".join(response.streaming_content)
+
+    def test_export_since(self, client: APIClient) -> None:
+        items = [
+            build_log_record_data(TableType.AIRCRAFT, meta={"Make": "Cessna"}),
+            build_log_record_data(
+                TableType.AIRCRAFT, meta={"Make": "Piper", "Record_Modified": 1}
+            ),
+        ]
+        client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+
+        response = client.get(reverse("export"), {"since": "2024-01-01T00:00:00Z"})
+
+        content = b"".join(response.streaming_content)
+        assert b"Cessna" in content
+        assert b"Piper" not in content
+
+    def test_export_user(self, client: APIClient) -> None:
+        items = [
+            build_log_record_data(TableType.AIRCRAFT, meta={"Make": "Cessna"}),
+            build_log_record_data(
+                TableType.AIRCRAFT, meta={"Make": "Piper"}, user_id=2
+            ),
+        ]
+        client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+
+        response = client.get(reverse("export"), {"user_id": 2})
+
+        content = b"".join(response.streaming_content)
+        assert b"Piper" in content
+        assert b"Cessna" not in content
+        assert response["ETag"] != client.get(reverse("export"))["ETag"]
+
+    def test_export_invalid_compression(self, client: APIClient) -> None:
+        response = client.get(reverse("export"), {"compression": "invalid"})
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncExportView:
+    @pytest.fixture(autouse=True)
+    def export_cache_dir(self, settings, tmp_path) -> None:
+        settings.EXPORT_CACHE_DIR = tmp_path
+
+    @staticmethod
+    @async_to_sync
+    async def get(path: str, data=None, **kwargs) -> tuple[HttpResponse, bytes]:
+        response = await AsyncClient().get(path, data, **kwargs)
+        if not response.streaming:
+            return response, response.content
+        return response, b"".join([chunk async for chunk in response])
+
+    def test_export(self, client: APIClient) -> None:
+        items = [
+            build_log_record_data(TableType.AIRCRAFT, meta={"Make": "Cessna"}),
+            build_log_record_data(TableType.FLIGHT, meta={"Route": "KJFK-KBOS"}),
+        ]
+        client.post(
+            reverse("import"), {"file": get_import_file(items)}, format="multipart"
+        )
+
+        response, content = self.get(reverse("export-async"))
+
+        assert response.status_code == 200
+        assert response.is_async
+        assert content == b"".join(client.get(reverse("export")).streaming_content)
+        assert b"Cessna" in content
+        assert b"KJFK-KBOS" in content
+
+    def test_export_not_modified(self) -> None:
+        response, _ = self.get(reverse("export-async"))
+
+        response, content = self.get(
+            reverse("export-async"), headers={"If-None-Match": response["ETag"]}
+        )
+
+        assert response.status_code == 304
+        assert content == b""
+
+    def test_export_wsgi(self, client: APIClient) -> None:
+        response = client.get(reverse("export-async"), {"user_id": 1})
+
+        assert response.status_code == 302
+        assert response["Location"] == f"{reverse('export')}?user_id=1"
+
+    def test_export_invalid_params(self) -> None:
+        response, content = self.get(reverse("export-async"), {"format": "invalid"})
+
+        assert response.status_code == 400
+        assert "format" in json.loads(content)
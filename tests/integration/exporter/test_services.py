@@ -0,0 +1,85 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from importer.services import validate_items
+from pilotlog.exporter.services import (
+    FETCH_STRATEGIES,
+    generate_logbook_template,
+    get_export_key,
+    iter_rows_with_keyset,
+)
+from pilotlog.importer.entities import TableType
+from pilotlog.importer.services import (
+    PilotlogCopySaver,
+    PilotlogDBSaver,
+    PilotlogJsonValidator,
+)
+from pilotlog.models import Aircraft
+from tests.factories import build_log_record_data
+
+
+pytestmark = pytest.mark.django_db  # noqa
+
+
+@pytest.fixture(autouse=True)
+def aircraft() -> None:
+    items = [build_log_record_data(TableType.AIRCRAFT) for _ in range(5)]
+    PilotlogDBSaver().save(
+        validate_items(items=items, json_validator=PilotlogJsonValidator())
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 10])
+def test_iter_rows_with_keyset(chunk_size: int) -> None:
+    queryset = Aircraft.objects.data_for_export()
+
+    rows = list(iter_rows_with_keyset(queryset, chunk_size=chunk_size))
+
+    assert rows == list(queryset.order_by("pk"))
+
+
+@pytest.mark.parametrize("fetch_strategy", FETCH_STRATEGIES)
+def test_generate_logbook_template(fetch_strategy: str) -> None:
+    template = generate_logbook_template(fetch_strategy=fetch_strategy, chunk_size=2)
+
+    rows = list(template.tables[0].iter_rows())
+
+    assert sorted(rows, key=lambda row: row["AircraftID"]) == sorted(
+        Aircraft.objects.data_for_export(), key=lambda row: row["AircraftID"]
+    )
+
+
+def test_generate_logbook_template_since() -> None:
+    since = datetime(2024, 6, 1, tzinfo=UTC)
+    aircraft = Aircraft.objects.first()
+    aircraft.record_modified = since
+    aircraft.save()
+
+    template = generate_logbook_template(since=since)
+
+    rows = list(template.tables[0].iter_rows())
+    assert [row["AircraftID"] for row in rows] == [str(aircraft.code)]
+    assert list(template.tables[1].iter_rows()) == []
+
+
+@pytest.mark.parametrize("saver", [PilotlogDBSaver, PilotlogCopySaver])
+def test_get_export_key_upsert_not_latest(saver: type[PilotlogDBSaver]) -> None:
+    items = [
+        build_log_record_data(TableType.FLIGHT, meta={"Record_Modified": modified})
+        for modified in [1000, 3000]
+    ]
+
+    def save() -> None:
+        saver(upsert=True).save(
+            validate_items(items=items, json_validator=PilotlogJsonValidator())
+        )
+
+    save()
+    export_key = get_export_key(["flights"])
+    # modification time of the upserted record is still older than of the other one
+    items[0]["meta"]["Record_Modified"] = 2000
+    items[0]["meta"]["Route"] = "KJFK-KBOS"
+    save()
+
+    assert get_export_key(["flights"]) != export_key
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from pilotlog.importer.entities import TableType
+from pilotlog.importer.generator import LogbookGenerator, write_log_records
+from pilotlog.importer.services import PilotlogJsonValidator, import_log_records
+from pilotlog.models import Flight, LogRecord, MyQueryBuild, Pilot, SettingConfig
+
+
+pytestmark = pytest.mark.django_db  # noqa
+
+
+def generate(**kwargs) -> list[dict]:
+    return list(LogbookGenerator(**{"flights": 100, **kwargs}).generate())
+
+
+class TestLogbookGenerator:
+    def test_generate(self) -> None:
+        log_records = generate(users=2, dangling_ratio=0)
+
+        validated = PilotlogJsonValidator().validate_many(log_records)
+
+        tables = {log_record.table for log_record in validated}
+        assert tables == set(TableType) - {TableType.AIRPORT}
+        assert {log_record.user_id for log_record in validated} == {1, 2}
+        flights = [item for item in validated if item.table == TableType.FLIGHT]
+        assert len(flights) == 200
+        pilot_codes = {
+            item.meta.code for item in validated if item.table == TableType.PILOT
+        }
+        assert {flight.meta.p1_code for flight in flights} <= pilot_codes
+        setting_codes = [
+            (item.user_id, item.meta.code)
+            for item in validated
+            if item.table == TableType.SETTING_CONFIG
+        ]
+        assert {code for _, code in setting_codes} == set(
+            range(1, LogbookGenerator.SETTINGS + 1)
+        )
+        assert len(setting_codes) == 2 * LogbookGenerator.SETTINGS
+
+    def test_seed(self) -> None:
+        assert generate(seed=1) == generate(seed=1)
+        assert generate(seed=1) != generate(seed=2)
+
+    def test_dangling_references(self) -> None:
+        log_records = generate(dangling_ratio=1)
+
+        codes = {log_record["guid"] for log_record in log_records}
+        flight = next(
+            log_record for log_record in log_records if log_record["table"] == "Flight"
+        )
+        assert flight["meta"]["P1Code"] not in codes
+        assert flight["meta"]["DepCode"] not in codes
+
+    def test_duplicates(self) -> None:
+        log_records = generate(duplicate_ratio=0.5)
+
+        guids = [log_record["guid"] for log_record in log_records]
+        assert len(set(guids)) < len(guids)
+        assert set(guids) == {log_record["guid"] for log_record in generate()}
+
+    def test_revision(self) -> None:
+        log_records = generate()
+        revised_log_records = generate(revision=1, changed_ratio=0.5)
+
+        changed = [
+            revised
+            for log_record, revised in zip(log_records, revised_log_records)
+            if revised["_modified"] > log_record["_modified"]
+        ]
+        assert [log_record["guid"] for log_record in log_records] == [
+            log_record["guid"] for log_record in revised_log_records
+        ]
+        assert 0 < len(changed) < len(log_records)
+
+
+class TestImportGenerated:
+    def test_import(self) -> None:
+        log_records = generate(dangling_ratio=0)
+
+        import_log_records(json.dumps(log_records))
+
+        assert LogRecord.objects.count() == len(log_records)
+        # pilots are saved after flights
+        assert not Flight.objects.filter(p1__isnull=True).exists()
+        assert Pilot.objects.count() == 2
+        assert not MyQueryBuild.objects.filter(my_query__isnull=True).exists()
+
+    def test_import_users(self) -> None:
+        log_records = generate(users=2)
+
+        import_log_records(json.dumps(log_records))
+
+        assert LogRecord.objects.count() == len(log_records)
+        assert SettingConfig.objects.filter(user_id=2).count() == (
+            LogbookGenerator.SETTINGS
+        )
+
+    def test_import_duplicates(self) -> None:
+        log_records = generate(duplicate_ratio=0.1)
+
+        import_log_records(json.dumps(log_records), upsert=True)
+
+        assert LogRecord.objects.count() == len({r["guid"] for r in log_records})
+
+    def test_reimport(self) -> None:
+        import_log_records(json.dumps(generate()))
+        revised_log_records = generate(revision=1)
+
+        stats = import_log_records(json.dumps(revised_log_records), delta=True)
+
+        assert stats.new == 0
+        assert stats.changed > 0
+        assert stats.changed + stats.skipped == len(revised_log_records)
+
+
+def test_write_log_records(tmp_path) -> None:
+    path = tmp_path / "logbook.json"
+    with open(path, "w") as file:
+        count = write_log_records(LogbookGenerator(flights=10).generate(), file)
+
+    assert json.loads(path.read_text()) == generate(flights=10)
+    assert count == len(generate(flights=10))
+
+
+def test_generate_logbook_command(tmp_path) -> None:
+    path = tmp_path / "logbook.json"
+
+    call_command("generate_logbook", str(path), "--flights=10", "--seed=3")
+
+    assert json.loads(path.read_text()) == generate(flights=10, seed=3)
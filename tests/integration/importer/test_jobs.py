@@ -0,0 +1,127 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from django.utils import timezone
+
+from pilotlog.importer.entities import TableType
+from pilotlog.importer.jobs import claim_next_job, run_import_job
+from pilotlog.models import ImportJob, Pilot
+from tests.factories import build_log_record_data
+
+
+# import runs in a separate thread with its own connection
+pytestmark = pytest.mark.django_db(transaction=True)  # noqa
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path) -> None:
+    settings.MEDIA_ROOT = tmp_path
+
+
+def create_job(items: list, **params) -> ImportJob:
+    return ImportJob.objects.create(
+        file=ContentFile(json.dumps(items).encode(), name="import.json"),
+        params=params,
+    )
+
+
+def test_claim_next_job() -> None:
+    first_job = create_job([])
+    create_job([])
+
+    job = claim_next_job()
+
+    assert job == first_job
+    assert job.status == ImportJob.Status.RUNNING
+    assert job.started_at is not None
+    assert job.heartbeat_at is not None
+    assert job.attempts == 1
+    assert claim_next_job() != first_job
+
+
+def test_claim_next_job_without_pending() -> None:
+    assert claim_next_job() is None
+
+
+def test_claim_next_job_stale(settings) -> None:
+    settings.IMPORT_JOB_TIMEOUT = 60
+    settings.IMPORT_JOB_MAX_ATTEMPTS = 2
+    stale_job = create_job([])
+    running_job = create_job([])
+    claim_next_job()
+    claim_next_job()
+    ImportJob.objects.filter(pk=stale_job.pk).update(
+        heartbeat_at=timezone.now() - timedelta(seconds=61)
+    )
+
+    job = claim_next_job()
+
+    assert job == stale_job
+    assert job.status == ImportJob.Status.RUNNING
+    assert job.attempts == 2
+    running_job.refresh_from_db()
+    assert running_job.status == ImportJob.Status.RUNNING
+
+    ImportJob.objects.filter(pk=stale_job.pk).update(
+        heartbeat_at=timezone.now() - timedelta(seconds=61)
+    )
+
+    assert claim_next_job() is None
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.FAILED
+    assert job.error == "Worker stopped responding"
+    assert job.finished_at is not None
+
+
+def test_run_import_job() -> None:
+    items = [build_log_record_data(TableType.PILOT) for _ in range(3)]
+    create_job(items, delta=True)
+    job = claim_next_job()
+
+    run_import_job(job, progress_interval=0.01)
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.SUCCEEDED
+    assert job.processed == 3
+    assert job.table_counts == {"pilot": 3}
+    assert job.stats == {"new": 3, "changed": 0, "skipped": 0}
+    assert job.finished_at is not None
+    assert not job.file
+    assert Pilot.objects.count() == 3
+
+
+def test_run_import_job_failed() -> None:
+    create_job([{"invalid": "item"}])
+    job = claim_next_job()
+
+    run_import_job(job)
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.FAILED
+    assert "ValidationError" in job.error
+
+
+def test_run_import_job_skip_invalid(client) -> None:
+    items = [
+        build_log_record_data(TableType.PILOT),
+        {"invalid": "item"},
+        build_log_record_data(TableType.PILOT),
+    ]
+    create_job(items, skip_invalid=True)
+    job = claim_next_job()
+
+    run_import_job(job)
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.SUCCEEDED
+    assert job.invalid == 1
+    assert Pilot.objects.count() == 2
+    response = client.get(reverse("import-job-errors", args=[job.pk]))
+    assert response["Content-Type"] == "application/x-ndjson"
+    errors = [
+        json.loads(line) for line in b"".join(response.streaming_content).splitlines()
+    ]
+    assert [(error["index"], error["guid"]) for error in errors] == [(1, None)]
@@ -0,0 +1,518 @@
+import hashlib
+import io
+import json
+import uuid
+from copy import deepcopy
+from datetime import UTC, datetime
+from typing import Callable, Iterable, Iterator
+
+import pytest
+from django.db import IntegrityError, connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from pydantic import ValidationError
+
+from importer.exceptions import ImportInProgressError
+from importer.services import ListErrorReport, chunked, validate_items
+from importer.types import ImportStats
+from pilotlog.importer.entities import TableType
+from pilotlog.importer.services import (
+    PilotlogCopySaver,
+    PilotlogDBSaver,
+    PilotlogJsonValidator,
+    exclude_unchanged_items,
+    get_file_hash,
+    import_log_records,
+)
+from pilotlog.models import (
+    Flight,
+    ImportCheckpoint,
+    ImportPendingRelation,
+    LogRecord,
+    Pilot,
+    Qualification,
+    SettingConfig,
+)
+from tests.factories import build_log_record_data
+
+
+pytestmark = pytest.mark.django_db  # noqa
+
+
+class TestPilotlogJsonValidator:
+    @pytest.fixture
+    def items(self) -> list[dict]:
+        return [
+            build_log_record_data(table)
+            for table in TableType
+            if table != TableType.AIRPORT
+        ]
+
+    def test_validate_many(self, items: list[dict]) -> None:
+        validator = PilotlogJsonValidator()
+
+        log_records = validator.validate_many(items)
+
+        assert log_records == [validator.validate(item) for item in items]
+        for log_record in log_records:
+            entity = validator.TABLE_TYPE_TO_ENTITY[log_record.table]
+            assert type(log_record.meta) is entity
+
+    def test_validate_json(self, items: list[dict]) -> None:
+        validator = PilotlogJsonValidator()
+
+        log_records = validator.validate_json(json.dumps(items))
+
+        assert log_records == validator.validate_many(items)
+
+    def test_validate_unknown_table(self) -> None:
+        item = {**build_log_record_data(TableType.PILOT), "table": "Unknown"}
+
+        with pytest.raises(ValidationError):
+            PilotlogJsonValidator().validate(item)
+
+
+class TestPilotlogDBSaver:
+    @pytest.fixture
+    def pilot_code(self) -> str:
+        return str(uuid.uuid4())
+
+    @pytest.fixture
+    def items(self, pilot_code: str) -> list[dict]:
+        # flights go before the pilot to check forward references
+        return [
+            build_log_record_data(
+                TableType.FLIGHT, meta={"P1Code": pilot_code, "P2Code": pilot_code}
+            ),
+            build_log_record_data(TableType.FLIGHT, meta={"P3Code": pilot_code}),
+            build_log_record_data(TableType.QUALIFICATION),
+            build_log_record_data(TableType.PILOT, meta={"PilotCode": pilot_code}),
+            build_log_record_data(TableType.AIRFIELD),
+        ]
+
+    @pytest.fixture(params=[PilotlogDBSaver, PilotlogCopySaver])
+    def save(self, request) -> Callable[..., None]:
+        def _save(items: list[dict], **kwargs) -> None:
+            request.param(**kwargs).save(
+                validate_items(items=items, json_validator=PilotlogJsonValidator())
+            )
+
+        return _save
+
+    @pytest.mark.parametrize("chunk_size", [None, 1, 2, 100])
+    def test_save(
+        self, save: Callable, items: list[dict], pilot_code: str, chunk_size
+    ) -> None:
+        save(items, chunk_size=chunk_size)
+
+        assert LogRecord.objects.count() == len(items)
+        assert Pilot.objects.filter(code=pilot_code).exists()
+        assert Qualification.objects.get().ref_airfield_id is None
+
+        flights = {str(flight.code): flight for flight in Flight.objects.all()}
+        first_flight = flights[items[0]["guid"]]
+        assert str(first_flight.p1_id) == pilot_code
+        assert str(first_flight.p2_id) == pilot_code
+        assert first_flight.p3_id is None
+        assert first_flight.dep_id is None
+        second_flight = flights[items[1]["guid"]]
+        assert second_flight.p1_id is None
+        assert str(second_flight.p3_id) == pilot_code
+
+    def test_save_sets_relations_on_creation(
+        self, save: Callable, items: list[dict], pilot_code: str
+    ) -> None:
+        with CaptureQueriesContext(connection) as context:
+            save(items)
+
+        assert not [q for q in context.captured_queries if "UPDATE" in q["sql"]]
+        assert Flight.objects.filter(p1_id=pilot_code).count() == 1
+
+    def test_adjust_relations(
+        self, save: Callable, items: list[dict], pilot_code: str
+    ) -> None:
+        aircraft = build_log_record_data(TableType.AIRCRAFT)
+        save([aircraft])
+        items[0]["meta"]["AircraftCode"] = aircraft["guid"]
+
+        with CaptureQueriesContext(connection) as context:
+            save(items, chunk_size=2)
+
+        updates = [q["sql"] for q in context.captured_queries if "UPDATE" in q["sql"]]
+        assert len(updates) == 1
+        flights = {str(flight.code): flight for flight in Flight.objects.all()}
+        first_flight = flights[items[0]["guid"]]
+        assert str(first_flight.aircraft_id) == aircraft["guid"]
+        assert str(first_flight.p1_id) == pilot_code
+        assert str(first_flight.p2_id) == pilot_code
+        assert first_flight.p3_id is None
+        assert str(flights[items[1]["guid"]].p3_id) == pilot_code
+
+    def test_get_tables_in_save_order(self) -> None:
+        tables = PilotlogDBSaver.get_tables_in_save_order()
+
+        assert set(tables) == set(PilotlogDBSaver.TABLE_TYPE_TO_MODEL)
+        assert tables.index(TableType.PILOT) < tables.index(TableType.FLIGHT)
+        assert tables.index(TableType.AIRCRAFT) < tables.index(TableType.FLIGHT)
+        assert tables.index(TableType.AIRFIELD) < tables.index(TableType.FLIGHT)
+        assert tables.index(TableType.AIRFIELD) < tables.index(TableType.QUALIFICATION)
+        assert tables.index(TableType.MY_QUERY) < tables.index(TableType.MY_QUERY_BUILD)
+
+    def test_save_existing_relation(
+        self, save: Callable, items: list[dict], pilot_code: str
+    ) -> None:
+        save(items[3:])
+        save(items[:1])
+
+        assert str(Flight.objects.get().p1_id) == pilot_code
+
+    def test_save_same_values(self, save: Callable, items: list[dict]) -> None:
+        save(items)
+
+        pilot = Pilot.objects.values().get()
+        meta = PilotlogJsonValidator().validate(items[3]).meta
+        assert pilot.pop("updated_at") is not None
+        assert pilot == {**meta.model_dump(), "user_id": items[3]["user_id"]}
+        log_record = LogRecord.objects.values().get(guid=items[3]["guid"])
+        assert log_record["modified"] == datetime(2024, 5, 18, 2, 40, tzinfo=UTC)
+
+    def test_save_user(self, save: Callable, items: list[dict]) -> None:
+        items[3]["user_id"] = 2
+
+        save(items)
+
+        assert set(Flight.objects.values_list("user_id", flat=True)) == {1}
+        assert Pilot.objects.get().user_id == 2
+
+    def test_save_duplicated_log_record(
+        self, save: Callable, items: list[dict]
+    ) -> None:
+        save(items[3:])
+        # log records are unique by guid, table and user, duplicates are ignored
+        save([build_log_record_data(TableType.PILOT, guid=items[3]["guid"])])
+
+        assert LogRecord.objects.filter(guid=items[3]["guid"]).count() == 1
+        assert Pilot.objects.count() == 2
+
+    def test_save_duplicated_meta(self, save: Callable, items: list[dict]) -> None:
+        save(items[3:])
+
+        with pytest.raises(IntegrityError):
+            save(items[3:])
+
+    def test_upsert(self, save: Callable, items: list[dict], pilot_code: str) -> None:
+        save(items)
+        items[0]["meta"]["Route"] = "new route"
+        items[0]["meta"]["Record_Modified"] += 1
+        items[0]["_modified"] += 1
+        items[1]["meta"]["Route"] = "not modified"
+
+        with CaptureQueriesContext(connection) as context:
+            save(items, upsert=True)
+
+        inserts = [q["sql"] for q in context.captured_queries if "INSERT" in q["sql"]]
+        assert len(inserts) == 2
+        assert Flight.objects.get(code=items[0]["guid"]).route == "new route"
+        assert Flight.objects.get(code=items[1]["guid"]).route == ""
+        assert str(Flight.objects.get(code=items[0]["guid"]).p1_id) == pilot_code
+        assert LogRecord.objects.get(guid=items[0]["guid"]).modified == datetime(
+            2024, 5, 18, 2, 40, 1, tzinfo=UTC
+        )
+
+    def test_upsert_duplicates(self, save: Callable, items: list[dict]) -> None:
+        updated_pilot = deepcopy(items[3])
+        updated_pilot["meta"]["PilotName"] = "new name"
+        updated_pilot["meta"]["Record_Modified"] += 1
+
+        save([updated_pilot, items[3]], upsert=True)
+
+        assert Pilot.objects.get().pilot_name == "new name"
+
+    @pytest.mark.parametrize("upsert", [False, True])
+    def test_save_same_code_by_users(self, save: Callable, upsert: bool) -> None:
+        items = [
+            build_log_record_data(
+                TableType.SETTING_CONFIG,
+                meta={"ConfigCode": 1, "Data": str(user_id)},
+                user_id=user_id,
+            )
+            for user_id in (1, 2)
+        ]
+
+        save(items[:1], upsert=upsert)
+        save(items[1:], upsert=upsert)
+
+        assert dict(SettingConfig.objects.values_list("user_id", "data")) == {
+            1: "1",
+            2: "2",
+        }
+        assert set(LogRecord.objects.values_list("user_id", flat=True)) == {1, 2}
+
+    def test_upsert_other_user(self, save: Callable, items: list[dict]) -> None:
+        save(items[3:4])
+        other_user_pilot = deepcopy(items[3])
+        other_user_pilot["user_id"] = 2
+        other_user_pilot["meta"]["PilotName"] = "new name"
+        other_user_pilot["meta"]["Record_Modified"] += 1
+
+        save([other_user_pilot], upsert=True)
+
+        pilot = Pilot.objects.get()
+        assert (pilot.user_id, pilot.pilot_name) == (1, "")
+        assert LogRecord.objects.filter(guid=items[3]["guid"]).count() == 2
+
+    def test_get_existing_related_ids(
+        self,
+        save: Callable,
+        items: list[dict],
+        pilot_code: str,
+        django_assert_num_queries,
+    ) -> None:
+        save(items[3:] + [build_log_record_data(TableType.PILOT)])
+        missing_code = uuid.uuid4()
+        fk_fields = PilotlogDBSaver.TABLE_TYPE_TO_MODEL[TableType.FLIGHT].fk_fields
+
+        with django_assert_num_queries(2):
+            related_model_ids = PilotlogDBSaver.get_existing_related_ids(
+                Flight,
+                fk_fields,
+                [
+                    {
+                        **dict.fromkeys(fk_fields.values(), missing_code),
+                        "p1_code": uuid.UUID(pilot_code),
+                        "aircraft_code": None,
+                    }
+                ],
+            )
+
+        assert related_model_ids["p1_id"] == {uuid.UUID(pilot_code)}
+        assert related_model_ids["p2_id"] == {uuid.UUID(pilot_code)}
+        assert related_model_ids["dep_id"] == set()
+        assert related_model_ids["aircraft_id"] == set()
+
+
+def test_exclude_unchanged_items() -> None:
+    items = [
+        build_log_record_data(TableType.PILOT),
+        build_log_record_data(TableType.PILOT),
+        build_log_record_data(TableType.AIRFIELD),
+    ]
+    PilotlogDBSaver().save(
+        validate_items(items=items[:2], json_validator=PilotlogJsonValidator())
+    )
+    items[1]["_modified"] += 1
+    stats = ImportStats()
+
+    assert list(
+        exclude_unchanged_items(enumerate(items), chunk_size=2, stats=stats)
+    ) == [(1, items[1]), (2, items[2])]
+    assert stats == ImportStats(new=1, changed=1, skipped=1)
+
+
+def test_exclude_unchanged_items_invalid() -> None:
+    items = [build_log_record_data(TableType.PILOT) for _ in range(3)]
+    PilotlogDBSaver().save(
+        validate_items(items=items, json_validator=PilotlogJsonValidator())
+    )
+    del items[0]["guid"]
+    items[1]["_modified"] = "invalid"
+    stats = ImportStats()
+
+    # records which can't be compared are left for validation
+    assert list(
+        exclude_unchanged_items(enumerate(items), chunk_size=2, stats=stats)
+    ) == [(0, items[0]), (1, items[1])]
+    assert stats == ImportStats(skipped=1)
+
+
+@pytest.mark.parametrize("commit_size", [0, 2])
+def test_import_log_records_delta_skip_invalid(commit_size: int) -> None:
+    items = [build_log_record_data(TableType.PILOT) for _ in range(3)]
+    import_log_records(json.dumps(items))
+    invalid_items = [
+        {
+            key: value
+            for key, value in build_log_record_data(TableType.PILOT).items()
+            if key != "guid"
+        },
+        {**build_log_record_data(TableType.PILOT), "_modified": "invalid"},
+        {**items[0], "_modified": "invalid"},
+    ]
+    error_report = ListErrorReport(item_fields=["guid"])
+
+    stats = import_log_records(
+        json.dumps(items + invalid_items),
+        delta=True,
+        commit_size=commit_size,
+        error_report=error_report,
+    )
+
+    assert [error["index"] for error in error_report.errors] == [3, 4, 5]
+    assert stats == ImportStats(new=1, skipped=3)
+    assert LogRecord.objects.count() == 3
+
+
+def test_import_log_records_parallel_validation(settings) -> None:
+    settings.IMPORT_VALIDATION_WORKERS = 2
+    items = [build_log_record_data(TableType.PILOT) for _ in range(5)]
+
+    import_log_records(json.dumps(items))
+
+    assert Pilot.objects.count() == 5
+
+
+class TestImportLogRecordsInBatches:
+    @pytest.fixture
+    def pilot_code(self) -> str:
+        return str(uuid.uuid4())
+
+    @pytest.fixture
+    def items(self, pilot_code: str) -> list[dict]:
+        # the pilot is saved by the last batch
+        return [
+            build_log_record_data(TableType.FLIGHT, meta={"P1Code": pilot_code}),
+            *[build_log_record_data(TableType.AIRFIELD) for _ in range(3)],
+            build_log_record_data(TableType.PILOT, meta={"PilotCode": pilot_code}),
+        ]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_import(
+        self, items: list[dict], pilot_code: str, settings, workers: int
+    ) -> None:
+        settings.IMPORT_VALIDATION_WORKERS = workers
+
+        with CaptureQueriesContext(connection) as context:
+            import_log_records(json.dumps(items), commit_size=2)
+
+        savepoints = [
+            q["sql"]
+            for q in context.captured_queries
+            if "RELEASE SAVEPOINT" in q["sql"]
+        ]
+        assert len(savepoints) >= 3
+        assert LogRecord.objects.count() == 5
+        assert str(Flight.objects.get().p1_id) == pilot_code
+        assert not ImportCheckpoint.objects.exists()
+
+    def test_resume(
+        self, monkeypatch, items: list[dict], pilot_code: str, settings
+    ) -> None:
+        settings.IMPORT_COMMIT_SIZE = 2
+        file = json.dumps(items)
+        save_chunks = PilotlogDBSaver.save_chunks
+        saved_chunks = []
+
+        def failing_save_chunks(self, chunk, *args) -> None:
+            if len(saved_chunks) == 2:
+                raise RuntimeError("Import failed")
+            chunk = list(chunk)
+            saved_chunks.append(chunk)
+            save_chunks(self, chunk, *args)
+
+        monkeypatch.setattr(PilotlogDBSaver, "save_chunks", failing_save_chunks)
+        with pytest.raises(RuntimeError):
+            import_log_records(file)
+
+        checkpoint = ImportCheckpoint.objects.get()
+        assert checkpoint.offset == 4
+        # reference to the pilot of the next batch is resolved after resume
+        pending_flight = checkpoint.pending_relations.get(
+            table=TableType.FLIGHT, code=items[0]["guid"]
+        )
+        assert pending_flight.fk_values["p1_code"] == pilot_code
+        assert LogRecord.objects.count() == 4
+
+        monkeypatch.setattr(PilotlogDBSaver, "save_chunks", save_chunks)
+        import_log_records(file)
+
+        assert LogRecord.objects.count() == 5
+        assert str(Flight.objects.get().p1_id) == pilot_code
+        assert not ImportCheckpoint.objects.exists()
+
+    def test_resume_delta(self, items: list[dict]) -> None:
+        file = json.dumps(items)
+        import_log_records(json.dumps(items[:2]))
+        ImportCheckpoint.objects.create(
+            file_hash=get_file_hash(file),
+            options={
+                "saver": "orm",
+                "upsert": False,
+                "delta": True,
+                "skip_invalid": False,
+            },
+            offset=2,
+            stats=ImportStats(new=2).model_dump(),
+        )
+
+        stats = import_log_records(file, delta=True, commit_size=2)
+
+        assert stats == ImportStats(new=5)
+        assert LogRecord.objects.count() == 5
+
+    def test_checkpoint_per_options(self, items: list[dict]) -> None:
+        file = json.dumps(items)
+        checkpoint = ImportCheckpoint.objects.create(
+            file_hash=get_file_hash(file), offset=2
+        )
+
+        import_log_records(file, commit_size=2)
+
+        # the checkpoint of other options is not resumed
+        assert LogRecord.objects.count() == 5
+        assert list(ImportCheckpoint.objects.all()) == [checkpoint]
+
+    def test_pending_relations_per_batch(self, pilot_code: str) -> None:
+        items = [
+            build_log_record_data(TableType.FLIGHT, meta={"P1Code": pilot_code})
+            for _ in range(3)
+        ]
+        items.append(
+            build_log_record_data(TableType.PILOT, meta={"PilotCode": pilot_code})
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            import_log_records(json.dumps(items), commit_size=1)
+
+        pending_relation_inserts = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(
+                f'INSERT INTO "{ImportPendingRelation._meta.db_table}"'
+            )
+        ]
+        # each batch inserts only relations of its own flight
+        assert len(pending_relation_inserts) == 3
+        assert all(sql.count(pilot_code) == 1 for sql in pending_relation_inserts)
+        assert Flight.objects.filter(p1_id=pilot_code).count() == 3
+        assert not ImportPendingRelation.objects.exists()
+
+    def test_concurrent_import(self, monkeypatch, items: list[dict]) -> None:
+        file = json.dumps(items)
+
+        def chunked_with_concurrent_import(
+            items: Iterable, chunk_size: int
+        ) -> Iterator[list]:
+            for number, chunk in enumerate(chunked(items, chunk_size)):
+                if chunk_size == 2 and number == 1:
+                    # another import of the file has committed the batch meanwhile
+                    ImportCheckpoint.objects.update(offset=F("offset") + 2)
+                yield chunk
+
+        monkeypatch.setattr(
+            "pilotlog.importer.services.chunked", chunked_with_concurrent_import
+        )
+
+        with pytest.raises(ImportInProgressError):
+            import_log_records(file, commit_size=2)
+
+        assert ImportCheckpoint.objects.get().offset == 4
+        assert LogRecord.objects.count() == 2
+
+
+@pytest.mark.parametrize("to_file", [str, str.encode, lambda s: io.BytesIO(s.encode())])
+def test_get_file_hash(to_file: Callable) -> None:
+    file = to_file("[]")
+
+    assert get_file_hash(file) == hashlib.sha256(b"[]").hexdigest()
+    if isinstance(file, io.BytesIO):
+        assert file.tell() == 0
@@ -0,0 +1,162 @@
+import uuid
+from copy import deepcopy
+from typing import Callable
+
+import pytest
+from django.db import connection
+from django.db.utils import NotSupportedError
+from django.test.utils import CaptureQueriesContext
+
+from importer.services import validate_items
+from importer.types import ImportStats
+from pilotlog.importer.entities import TableType
+from pilotlog.importer.services import (
+    PilotlogCopySaver,
+    PilotlogDBSaver,
+    PilotlogJsonValidator,
+    exclude_unchanged_items,
+)
+from pilotlog.models import Flight, LogRecord
+from pilotlog.partitioning import (
+    add_key_to_columns,
+    get_partitioned_tables,
+    partition_tables,
+)
+from tests.factories import build_log_record_data
+
+
+pytestmark = pytest.mark.django_db  # noqa
+
+
+@pytest.mark.parametrize(
+    "definition,expected",
+    [
+        ("PRIMARY KEY (code)", "PRIMARY KEY (code, user_id)"),
+        (
+            'UNIQUE (guid, "table") INCLUDE (modified)',
+            'UNIQUE (guid, "table", user_id) INCLUDE (modified)',
+        ),
+        ("UNIQUE (code, user_id)", "UNIQUE (code, user_id)"),
+    ],
+)
+def test_add_key_to_columns(definition: str, expected: str) -> None:
+    assert add_key_to_columns(definition, "user_id") == expected
+
+
+class TestPartitionTables:
+    @pytest.fixture
+    def items(self) -> list[dict]:
+        return [
+            build_log_record_data(TableType.FLIGHT, user_id=user_id)
+            for user_id in [1, 2, 3, 4]
+        ]
+
+    @pytest.fixture(params=[PilotlogDBSaver, PilotlogCopySaver])
+    def save(self, request) -> Callable[..., None]:
+        def _save(items: list[dict], **kwargs) -> None:
+            request.param(**kwargs).save(
+                validate_items(items=items, json_validator=PilotlogJsonValidator())
+            )
+
+        return _save
+
+    def test_partition_tables(self, save: Callable, items: list[dict]) -> None:
+        save(items[:2])
+
+        tables = partition_tables(2)
+
+        assert tables == [LogRecord._meta.db_table, Flight._meta.db_table]
+        assert set(tables) <= get_partitioned_tables()
+        assert partition_tables(2) == []
+        # existing rows are moved to partitions
+        assert Flight.objects.count() == 2
+        assert LogRecord.objects.count() == 2
+
+        save(items[2:])
+
+        assert Flight.objects.count() == 4
+        assert LogRecord.objects.count() == 4
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {Flight._meta.db_table}_p0 "
+                f"UNION ALL SELECT count(*) FROM {Flight._meta.db_table}_p1"
+            )
+            assert sum(count for (count,) in cursor.fetchall()) == 4
+
+    def test_nullable_key_before_postgres_15(self, monkeypatch) -> None:
+        monkeypatch.setattr(connection, "pg_version", 140005)
+
+        with pytest.raises(NotSupportedError):
+            partition_tables(2)
+
+        assert get_partitioned_tables() == set()
+
+    def test_upsert(self, save: Callable, items: list[dict]) -> None:
+        partition_tables(2)
+        save(items)
+        items[0]["meta"]["Route"] = "new route"
+        items[0]["meta"]["Record_Modified"] += 1
+
+        save(items, upsert=True)
+
+        assert Flight.objects.count() == 4
+        assert Flight.objects.get(code=items[0]["guid"]).route == "new route"
+
+    def test_upsert_other_user(self, save: Callable, items: list[dict]) -> None:
+        partition_tables(2)
+        save(items[:1])
+        # the same flight of another user, modified earlier
+        other_user_item = deepcopy(items[0]) | {"user_id": 2}
+        other_user_item["meta"]["Record_Modified"] -= 1
+
+        with CaptureQueriesContext(connection) as context:
+            save([other_user_item], upsert=True)
+
+        assert Flight.objects.filter(code=items[0]["guid"]).count() == 2
+        flight_lookups = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(f'SELECT "{Flight._meta.db_table}"')
+        ]
+        assert flight_lookups
+        assert all('"user_id" IN (2)' in sql for sql in flight_lookups)
+
+    def test_adjust_relations_per_user(self, save: Callable) -> None:
+        partition_tables(2)
+        pilot = build_log_record_data(TableType.PILOT)
+        flight = build_log_record_data(TableType.FLIGHT, meta={"P1Code": pilot["guid"]})
+        # the same flight of another user references a missing pilot
+        other_user_flight = deepcopy(flight) | {"user_id": 2}
+        other_user_flight["meta"]["P1Code"] = str(uuid.uuid4())
+
+        save([flight, other_user_flight, pilot], chunk_size=1)
+
+        assert str(Flight.objects.get(user_id=1).p1_id) == pilot["guid"]
+        assert Flight.objects.get(user_id=2).p1_id is None
+
+    def test_exclude_unchanged_items_per_user(
+        self, save: Callable, items: list[dict]
+    ) -> None:
+        partition_tables(2)
+        save(items[:1])
+        other_user_item = items[0] | {"user_id": 2}
+        stats = ImportStats()
+
+        with CaptureQueriesContext(connection) as context:
+            indexed_items = list(
+                exclude_unchanged_items(
+                    enumerate([items[0], other_user_item]), chunk_size=2, stats=stats
+                )
+            )
+
+        assert indexed_items == [(1, other_user_item)]
+        assert stats == ImportStats(new=1, skipped=1)
+        assert '"user_id" IN' in context.captured_queries[-1]["sql"]
+
+    def test_partition_pruning(self, save: Callable, items: list[dict]) -> None:
+        partition_tables(4)
+        save(items)
+
+        plan = Flight.objects.data_for_export(user_id=1).explain()
+
+        assert plan.count(f" on {Flight._meta.db_table}_p") == 1
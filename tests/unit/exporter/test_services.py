@@ -1,6 +1,24 @@
+import gzip
+import io
+import time
+from datetime import date
+from itertools import islice
+from typing import Iterator
+
 import pytest
 
-from exporter.services import CSVWriter, CSVTemplateRenderer
+from exporter.services import (
+    ArrowIPCWriter,
+    ArrowTableRenderer,
+    CSVTemplateRenderer,
+    CSVWriter,
+    FileExportCache,
+    GzipCompressor,
+    ParquetWriter,
+    ZstdCompressor,
+    encode_chunks,
+    negotiate_compressor,
+)
 from exporter.types import Template, Table, Header, HeaderFieldType
 
 
@@ -13,6 +31,22 @@ class TestCSVWriter:
         data = [["a", "b"], [1, 2], [3, 4]]
         assert list(service.write(data)) == ["a,b\r\n", "1,2\r\n", "3,4\r\n"]
 
+    @pytest.mark.parametrize(
+        "buffer_size, expected",
+        [
+            (1, [b"a,b\r\n", b"1,2\r\n", b'"3,\xc3\xa9",4\r\n']),
+            (10, [b"a,b\r\n1,2\r\n", b'"3,\xc3\xa9",4\r\n']),
+            (1000, [b'a,b\r\n1,2\r\n"3,\xc3\xa9",4\r\n']),
+        ],
+    )
+    def test_write_buffered(self, buffer_size: int, expected: list[bytes]) -> None:
+        data = [["a", "b"], [1, 2], ["3,é", 4]]
+
+        chunks = list(CSVWriter(buffer_size=buffer_size).write(data))
+
+        assert chunks == expected
+        assert b"".join(chunks) == "".join(CSVWriter().write(data)).encode()
+
 
 class TestCSVTemplateRenderer:
     @pytest.fixture
@@ -57,6 +91,32 @@ class TestCSVTemplateRenderer:
         actual = list(service.render(template=template))
         assert expected == actual
 
+    def test_render_lazy_rows(
+        self, service: CSVTemplateRenderer, template: Template
+    ) -> None:
+        rows = template.tables[0].rows
+        calls = []
+
+        def get_rows() -> Iterator[dict]:
+            calls.append(1)
+            yield from rows
+
+        template.tables[0].rows = get_rows
+        rendered = service.render(template=template)
+
+        assert list(islice(rendered, 2)) == [["Test Template", ""], ["", ""]]
+        assert calls == []
+        assert list(rendered)[3] == [1, 2]
+        assert calls == [1]
+
+    def test_render_rows_iterator(
+        self, service: CSVTemplateRenderer, template: Template
+    ) -> None:
+        rows = template.tables[0].rows
+        template.tables[0].rows = iter(rows)
+
+        assert list(service.render(template=template))[5] == [1, 2]
+
     def test_big_number_of_headers(
         self, service: CSVTemplateRenderer, template: Template
     ) -> None:
@@ -68,3 +128,166 @@ class TestCSVTemplateRenderer:
         ]
 
         assert len(list(service.render(template=template))[0]) == number_of_columns
+
+
+class TestArrowTableRenderer:
+    @pytest.fixture(autouse=True)
+    def pyarrow(self) -> None:
+        pytest.importorskip("pyarrow")
+
+    @pytest.fixture
+    def table(self) -> Table:
+        return Table(
+            name="Test Table",
+            headers=[
+                Header(name="text", field_type=HeaderFieldType.TEXT),
+                Header(name="number", field_type=HeaderFieldType.NUMBER),
+                Header(name="date", field_type=HeaderFieldType.DATE),
+                Header(name="boolean", field_type=HeaderFieldType.BOOLEAN),
+                Header(name="decimal", field_type=HeaderFieldType.DECIMAL),
+            ],
+            rows=[
+                {"text": 1, "number": 2, "date": date(2024, 1, 1), "boolean": True},
+                {"text": "", "number": "", "date": "2024-01-02", "decimal": 1.5},
+                {"text": "c", "number": 3},
+            ],
+        )
+
+    def test_render(self, table: Table) -> None:
+        batches = list(ArrowTableRenderer(batch_size=2).render(table))
+
+        assert [batch.num_rows for batch in batches] == [2, 1]
+        assert [str(field.type) for field in batches[0].schema] == [
+            "string",
+            "int64",
+            "date32[day]",
+            "bool",
+            "double",
+        ]
+        assert batches[0].to_pylist() == [
+            {
+                "text": "1",
+                "number": 2,
+                "date": date(2024, 1, 1),
+                "boolean": True,
+                "decimal": None,
+            },
+            {
+                "text": None,
+                "number": None,
+                "date": date(2024, 1, 2),
+                "boolean": None,
+                "decimal": 1.5,
+            },
+        ]
+
+    def test_render_empty(self, table: Table) -> None:
+        table.rows = []
+
+        batches = list(ArrowTableRenderer().render(table))
+
+        assert len(batches) == 1
+        assert batches[0].num_rows == 0
+
+    def test_parquet_writer(self, table: Table) -> None:
+        from pyarrow import parquet
+
+        batches = list(ArrowTableRenderer(batch_size=2).render(table))
+
+        data = b"".join(ParquetWriter().write(batches))
+
+        parquet_file = parquet.ParquetFile(io.BytesIO(data))
+        assert parquet_file.num_row_groups == 2
+        assert parquet_file.read_row_group(0).to_batches()[0] == batches[0]
+
+    def test_arrow_ipc_writer(self, table: Table) -> None:
+        from pyarrow import ipc
+
+        batches = list(ArrowTableRenderer(batch_size=2).render(table))
+
+        data = b"".join(ArrowIPCWriter().write(batches))
+
+        assert list(ipc.open_stream(data)) == batches
+
+
+class TestFileExportCache:
+    def test_get_and_set(self, tmp_path) -> None:
+        cache = FileExportCache(tmp_path, max_size=100, chunk_size=2)
+
+        assert cache.get("key") is None
+        assert list(cache.set("key", [b"abc", b"d"])) == [b"abc", b"d"]
+        assert list(cache.get("key")) == [b"ab", b"cd"]
+
+    def test_set_not_consumed(self, tmp_path) -> None:
+        cache = FileExportCache(tmp_path, max_size=100)
+
+        content = cache.set("key", [b"abc", b"d"])
+        next(content)
+        content.close()
+
+        assert cache.get("key") is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_evict_least_recently_used(self, tmp_path) -> None:
+        cache = FileExportCache(tmp_path, max_size=12)
+        for key in ("a", "b", "c"):
+            list(cache.set(key, [b"1234"]))
+            time.sleep(0.01)
+        list(cache.get("a"))
+
+        list(cache.set("d", [b"1234"]))
+
+        assert {path.name for path in tmp_path.iterdir()} == {"a", "c", "d"}
+
+
+class TestCompressors:
+    @pytest.fixture
+    def data(self) -> list[bytes]:
+        return [b"a,b\r\n" * 1000, b"", b"1,2\r\n" * 1000]
+
+    def test_gzip(self, data: list[bytes]) -> None:
+        compressed = b"".join(GzipCompressor().compress(data))
+
+        assert gzip.decompress(compressed) == b"".join(data)
+
+    def test_zstd(self, data: list[bytes]) -> None:
+        zstandard = pytest.importorskip("zstandard")
+
+        compressed = b"".join(ZstdCompressor().compress(data))
+
+        decompressor = zstandard.ZstdDecompressor()
+        assert decompressor.decompressobj().decompress(compressed) == b"".join(data)
+
+
+def test_encode_chunks() -> None:
+    chunks = encode_chunks(["a,b\r\n", b"1,2\r\n", "ä\r\n"])
+
+    assert list(chunks) == [b"a,b\r\n", b"1,2\r\n", "ä\r\n".encode()]
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("zstd;q=0.5, gzip", "gzip"),
+        ("zstd;q=0, gzip;q=0", None),
+        ("*", "zstd"),
+        ("*;q=0.1, gzip;q=0.5", "gzip"),
+        ("GZIP;q=invalid", None),
+    ],
+)
+def test_negotiate_compressor(
+    monkeypatch, accept_encoding: str, expected: str | None
+) -> None:
+    # zstd is available only if `zstandard` is installed
+    monkeypatch.setattr(
+        "exporter.services.COMPRESSORS",
+        {"zstd": ZstdCompressor, "gzip": GzipCompressor},
+    )
+
+    compressor = negotiate_compressor(accept_encoding)
+
+    assert (compressor and compressor.encoding) == expected
@@ -1,8 +1,37 @@
+import io
 import json
+import pickle
+import uuid
+from datetime import date
+from enum import Enum
 
 import pytest
+from pydantic import BaseModel, ValidationError
 
-from importer.services import JsonFileReader
+from importer.exceptions import ItemValidationError
+from importer.interfaces import JsonValidator
+from importer.services import (
+    JsonFileReader,
+    JsonLinesErrorReport,
+    JsonStreamFileReader,
+    ListErrorReport,
+    chunked,
+    dump_model,
+    load_model,
+    validate_items,
+    validate_items_in_parallel,
+)
+
+
+class Item(BaseModel):
+    a: int
+
+
+class ItemValidator(JsonValidator[Item]):
+    pydantic_model = Item
+
+    def get_data_for_model(self, item: dict) -> dict:
+        return item
 
 
 class TestJsonFileReader:
@@ -21,3 +50,175 @@ class TestJsonFileReader:
     def test_read_invalid(self, service: JsonFileReader) -> None:
         with pytest.raises(json.JSONDecodeError):
             service.read("invalid")
+
+
+class TestJsonStreamFileReader:
+    @pytest.fixture
+    def service(self) -> JsonStreamFileReader:
+        return JsonStreamFileReader(chunk_size=4)
+
+    @pytest.fixture
+    def items(self) -> list[dict]:
+        return [
+            {"table": "Pilot", "meta": {"Name": "a \\ b"}, "_modified": 1616317613},
+            {"table": "Flight", "meta": {"Name": "ключ"}, "_modified": 1.5},
+            {"table": "Aircraft", "meta": {}, "_modified": 1234567890},
+        ]
+
+    def test_read_array(self, service: JsonStreamFileReader, items: list) -> None:
+        data = json.dumps(items, ensure_ascii=False)
+        assert list(service.read(data)) == items
+
+    def test_read_bytes_file(self, service: JsonStreamFileReader, items: list) -> None:
+        data = io.BytesIO(json.dumps(items, ensure_ascii=False).encode())
+        assert list(service.read(data)) == items
+
+    def test_read_is_lazy(self, service: JsonStreamFileReader) -> None:
+        data = io.StringIO('[{"a": 1}, {"b": 2}, invalid')
+        reader = service.read(data)
+        assert next(reader) == {"a": 1}
+        assert next(reader) == {"b": 2}
+        with pytest.raises(json.JSONDecodeError):
+            next(reader)
+
+    def test_read_escaped_quotes(self, service: JsonStreamFileReader) -> None:
+        data = '[{"meta": {\\"Name\\": \\"x\\"}}, {\\"a\\": 1}]'
+        assert list(service.read(data)) == list(JsonFileReader().read(data))
+
+    @pytest.mark.parametrize(
+        "data, expected",
+        [
+            ("[]", []),
+            (" [ 1 , 22 ,333 ] ", [1, 22, 333]),
+            ("[1.25,-1e3, true]", [1.25, -1e3, True]),
+            ('{"a": 1, "b": 2}', [{"a": 1, "b": 2}]),
+        ],
+    )
+    def test_read(self, service: JsonStreamFileReader, data: str, expected) -> None:
+        assert list(service.read(data)) == expected
+
+    @pytest.mark.parametrize(
+        "data", ["", "invalid", "[", "[1,", "[1 2]", "[1,]", "[1] 2", "{1}"]
+    )
+    def test_read_invalid(self, service: JsonStreamFileReader, data: str) -> None:
+        with pytest.raises(json.JSONDecodeError):
+            list(service.read(data))
+
+
+class TestValidateItemsInParallel:
+    def test_validate(self) -> None:
+        items = [{"a": i} for i in range(25)]
+
+        validated_items = validate_items_in_parallel(
+            items, ItemValidator(), workers=2, batch_size=3
+        )
+
+        assert list(validated_items) == list(validate_items(items, ItemValidator()))
+
+    def test_validate_invalid(self) -> None:
+        items = [{"a": 1}, {"a": 2}, {"a": "invalid"}, {"a": 4}]
+
+        with pytest.raises(ItemValidationError) as exc_info:
+            list(validate_items_in_parallel(items, ItemValidator(), 2, batch_size=2))
+
+        assert exc_info.value.index == 2
+        assert exc_info.value.item == {"a": "invalid"}
+        assert isinstance(exc_info.value.error, ValidationError)
+
+    def test_validate_invalid_indexes(self) -> None:
+        items = [{"a": 1}, {"a": 2}, {"a": "invalid"}, {"a": 4}]
+
+        with pytest.raises(ItemValidationError) as exc_info:
+            list(
+                validate_items_in_parallel(
+                    items, ItemValidator(), 2, batch_size=2, indexes=[0, 3, 7, 9]
+                )
+            )
+
+        assert exc_info.value.index == 7
+
+
+class TestErrorReport:
+    @pytest.fixture
+    def items(self) -> list:
+        return [{"a": 1, "id": "x"}, {"a": "invalid", "id": "y"}, "invalid", {"a": 4}]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_skip_invalid(self, items: list, workers: int) -> None:
+        error_report = ListErrorReport(item_fields=["id"])
+
+        if workers > 1:
+            validated_items = validate_items_in_parallel(
+                items, ItemValidator(), workers, batch_size=2, error_report=error_report
+            )
+        else:
+            validated_items = validate_items(
+                items, ItemValidator(), error_report=error_report
+            )
+
+        assert list(validated_items) == [Item(a=1), Item(a=4)]
+        assert error_report.count == 2
+        assert [error["index"] for error in error_report.errors] == [1, 2]
+        assert [error["id"] for error in error_report.errors] == ["y", None]
+        assert error_report.errors[0]["errors"] == [
+            {
+                "type": "int_parsing",
+                "loc": ("a",),
+                "msg": "Input should be a valid integer, "
+                "unable to parse string as an integer",
+            }
+        ]
+        assert error_report.errors[1]["errors"][0]["type"] == "TypeError"
+
+    def test_json_lines(self, items: list) -> None:
+        file = io.StringIO()
+        error_report = JsonLinesErrorReport(file, item_fields=["id"])
+
+        list(
+            validate_items(items, ItemValidator(), error_report, indexes=range(10, 14))
+        )
+
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        assert [(line["index"], line["id"]) for line in lines] == [
+            (11, "y"),
+            (12, None),
+        ]
+        assert lines[0]["errors"][0]["loc"] == ["a"]
+
+
+@pytest.mark.parametrize(
+    "items, chunk_size, expected",
+    [
+        ([], 2, []),
+        ([1, 2, 3], 2, [[1, 2], [3]]),
+        ([1, 2], 2, [[1, 2]]),
+    ],
+)
+def test_chunked(items: list, chunk_size: int, expected: list) -> None:
+    assert list(chunked(iter(items), chunk_size)) == expected
+
+
+class Color(Enum):
+    RED = "red"
+
+
+class Record(BaseModel):
+    code: uuid.UUID
+    ref: uuid.UUID | None
+    color: Color
+    day: date | None
+    item: Item
+
+
+@pytest.mark.parametrize("ref", [uuid.uuid4(), None])
+def test_dump_model(ref: uuid.UUID | None) -> None:
+    record = Record(
+        code=uuid.uuid4(), ref=ref, color="red", day="2024-01-01", item={"a": 1}
+    )
+
+    loaded_record = load_model(pickle.loads(pickle.dumps(dump_model(record))))
+
+    assert loaded_record == record
+    assert loaded_record.model_dump() == record.model_dump()
+    assert isinstance(loaded_record.code, uuid.UUID)
+    assert loaded_record.color is Color.RED